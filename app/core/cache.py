@@ -0,0 +1,81 @@
+"""Small in-process caches shared by the request hot paths."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Потокобезопасный LRU-кэш с временем жизни записей.
+
+    - при переполнении maxsize вытесняется давно не использованная запись;
+    - запись старше ttl секунд считается отсутствующей и удаляется при чтении;
+      при set можно задать для записи меньший ttl.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        if ttl is None or ttl > self._ttl:
+            ttl = self._ttl
+        if ttl <= 0:
+            return
+
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def increment(self: TTLCache[K, int], key: K) -> int:
+        """
+        Атомарно увеличивает счётчик (нет записи или истекла — с нуля)
+        и продлевает его ttl; возвращает новое значение.
+        """
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            value = item[1] + 1 if item is not None and item[0] > now else 1
+            self._data[key] = (now + self._ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[1] if item is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
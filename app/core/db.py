@@ -3,9 +3,23 @@
 This module centralizes the engine and session factory configuration so that
 all models share the same Base. It is intentionally minimal to keep
 initialization predictable for both admin and Telegram entry points.
+
+Two engines are exposed: an ``asyncpg``-backed one for FastAPI handlers
+(``get_async_db``) and the original ``psycopg2`` one for synchronous code such
+as the Arq file indexer (``get_db`` / ``SessionLocal``).
 """
 
+from collections.abc import AsyncIterator
+from uuid import uuid4
+
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.core.config import settings
@@ -15,6 +29,28 @@ class Base(DeclarativeBase):
     pass
 
 
+def _pool_options() -> dict:
+    """Connection pool settings shared by the sync and async engines."""
+
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
+def _json_dumps(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC).decode()
+
+
+def _json_options() -> dict:
+    """JSON/JSONB columns are (de)serialized with ``orjson`` on both engines."""
+
+    return {"json_serializer": _json_dumps, "json_deserializer": orjson.loads}
+
+
 def _create_engine():
     """Create a SQLAlchemy engine with UTF-8 enforced.
 
@@ -27,8 +63,9 @@ def _create_engine():
     try:
         return create_engine(
             settings.DATABASE_URL,
-            pool_pre_ping=True,
             connect_args={"client_encoding": "utf8"},
+            **_pool_options(),
+            **_json_options(),
         )
     except UnicodeDecodeError as exc:  # pragma: no cover - defensive guard
         raise RuntimeError(
@@ -49,3 +86,64 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _statement_cache_size() -> int:
+    """asyncpg statement cache size; disabled behind PgBouncer.
+
+    In transaction pooling mode consecutive transactions may land on
+    different server connections, so statements prepared on one of them
+    cannot be reused.
+    """
+
+    return 0 if settings.DB_PGBOUNCER else settings.DB_STATEMENT_CACHE_SIZE
+
+
+def _async_connect_args() -> dict:
+    """asyncpg ``connect`` arguments.
+
+    Behind PgBouncer prepared statements also get unique names: the default
+    per-connection counter (``__asyncpg_stmt_1__``, ...) repeats across
+    client connections, and a statement prepared by one client may still
+    exist on the server connection the next transaction lands on.
+    """
+
+    connect_args: dict = {"statement_cache_size": _statement_cache_size()}
+    if settings.DB_PGBOUNCER:
+        connect_args["prepared_statement_name_func"] = (
+            lambda: f"__asyncpg_{uuid4()}__"
+        )
+    return connect_args
+
+
+def _async_database_url() -> URL:
+    """Return ``DATABASE_URL`` with the driver switched to ``asyncpg``.
+
+    The same ``postgresql+psycopg2://`` URL is used for both engines so that
+    deployments only configure one DSN. SQLAlchemy's own prepared statement
+    cache for asyncpg is sized through the URL query.
+    """
+
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg")
+    return url.update_query_dict(
+        {"prepared_statement_cache_size": str(_statement_cache_size())}
+    )
+
+
+async_engine = create_async_engine(
+    _async_database_url(),
+    connect_args=_async_connect_args(),
+    **_pool_options(),
+    **_json_options(),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+
 from arq.connections import ArqRedis, RedisSettings, create_pool
 
 from app.core.config import settings
 
 _redis_pool: ArqRedis | None = None
+# Защита от двойного создания пула при одновременных первых запросах
+_redis_pool_lock = asyncio.Lock()
 
 
 async def get_arq_redis() -> ArqRedis:
@@ -19,9 +23,9 @@ async def get_arq_redis() -> ArqRedis:
     global _redis_pool
 
     if _redis_pool is None:
-        # settings.REDIS_URL — это AnyUrl из Pydantic, Arq ожидает либо строку,
-        # либо RedisSettings. Приводим к строке и создаём RedisSettings.
-        redis_settings = RedisSettings.from_dsn(str(settings.REDIS_URL))
-        _redis_pool = await create_pool(redis_settings)
+        async with _redis_pool_lock:
+            if _redis_pool is None:
+                redis_settings = RedisSettings.from_dsn(settings.REDIS_URL)
+                _redis_pool = await create_pool(redis_settings)
     return _redis_pool
 
@@ -0,0 +1,68 @@
+"""Shared HTTP client plumbing for calls to external APIs."""
+
+from __future__ import annotations
+
+import ssl
+from typing import Any
+
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import settings
+
+
+def create_ssl_context() -> ssl.SSLContext:
+    """
+    SSLContext с проверкой сертификата и имени хоста.
+
+    CA — из CA_BUNDLE (корпоративный прокси) или из certifi, как у requests.
+    """
+    return ssl.create_default_context(cafile=settings.CA_BUNDLE or certifi.where())
+
+
+class SSLContextAdapter(HTTPAdapter):
+    """
+    HTTPAdapter с одним SSLContext на все соединения пула.
+
+    requests по умолчанию передаёт urllib3 путь к CA bundle, и тот заново
+    загружает его в контекст на каждом новом соединении; здесь корневые
+    сертификаты уже загружены в общий контекст (с ним же работает
+    возобновление TLS-сессий).
+    """
+
+    def __init__(self, ssl_context: ssl.SSLContext, **kwargs: Any) -> None:
+        self._ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["ssl_context"] = self._ssl_context
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, *args: Any, **kwargs: Any) -> Any:
+        kwargs["ssl_context"] = self._ssl_context
+        return super().proxy_manager_for(*args, **kwargs)
+
+    def cert_verify(self, conn: Any, url: str, verify: Any, cert: Any) -> None:
+        super().cert_verify(conn, url, verify, cert)
+        if verify is True:
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+
+_ssl_context = create_ssl_context()
+
+
+def create_session(
+    pool_maxsize: int = 10, max_retries: Retry | int = 0
+) -> requests.Session:
+    """requests.Session с keep-alive пулом на общем SSLContext процесса."""
+    session = requests.Session()
+    session.mount(
+        "https://",
+        SSLContextAdapter(
+            _ssl_context, pool_maxsize=pool_maxsize, max_retries=max_retries
+        ),
+    )
+    return session
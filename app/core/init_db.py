@@ -0,0 +1,50 @@
+"""One-shot schema bootstrap.
+
+Run once per deployment (``python -m app.core.init_db``) instead of calling
+``create_all`` from every API process on startup. All model modules are
+imported here so that their tables are registered on ``Base.metadata``.
+"""
+
+from sqlalchemy import inspect
+
+import app.modules.auth.models  # noqa: F401
+import app.modules.chats.models  # noqa: F401
+import app.modules.customers.models  # noqa: F401
+import app.modules.files.models  # noqa: F401
+from app.core.db import Base, engine
+from app.core.logging import configure_logging, get_logger
+
+logger = get_logger(__name__)
+
+
+def init_db() -> None:
+    """Create missing tables for all registered models.
+
+    Existing tables are listed with a single catalog query instead of the
+    per-table ``has_table`` reflection ``create_all`` does by default; when
+    nothing is missing no DDL is issued at all.
+    """
+
+    with engine.connect() as conn:
+        existing = set(inspect(conn).get_table_names())
+
+    missing = [
+        table
+        for table in Base.metadata.sorted_tables
+        if table.name not in existing
+    ]
+    if missing:
+        Base.metadata.create_all(bind=engine, tables=missing, checkfirst=False)
+
+    logger.info(
+        "Database schema is up to date",
+        extra={
+            "tables": len(Base.metadata.tables),
+            "created": [table.name for table in missing],
+        },
+    )
+
+
+if __name__ == "__main__":
+    configure_logging()
+    init_db()
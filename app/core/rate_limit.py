@@ -0,0 +1,52 @@
+"""In-process rate limiting for calls to external APIs."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Потокобезопасный token bucket.
+
+    - токены пополняются со скоростью rate в секунду, но не больше capacity:
+      после простоя допускается всплеск до capacity запросов подряд;
+    - acquire сразу резервирует токены (баланс может уйти в минус) и
+      возвращает, сколько секунд подождать: одновременные вызовы выстраиваются
+      в очередь, а не будят друг друга.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Резервирует tokens; возвращает задержку в секундах (0 — без ожидания)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._last) * self._rate
+            )
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def wait(self, tokens: float = 1.0) -> None:
+        """acquire со сном на нужную задержку."""
+        delay = self.acquire(tokens)
+        if delay:
+            time.sleep(delay)
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Сдвигает следующие запросы на seconds (ответ 429 от API):
+        накопленный запас сгорает, всплеска после паузы не будет.
+        """
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self._rate
@@ -1,19 +1,108 @@
 # app/core/security.py
-from datetime import datetime, timedelta, timezone
+import asyncio
+import hashlib
+import os
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict
 
+import bcrypt
 import jwt
-from passlib.context import CryptContext
+import orjson
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-# Настройка bcrypt через passlib
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
+MAX_BCRYPT_BYTES = 72
+BCRYPT_ROUNDS = 12
+
+# Отдельный пул под bcrypt: он отпускает GIL, поэтому потоков хватает по
+# числу ядер, а всплеск логинов не занимает общий threadpool FastAPI/asyncio
+_BCRYPT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="bcrypt",
 )
 
-MAX_BCRYPT_BYTES = 72
+
+def _load_jwt_keys() -> tuple[Any, Any]:
+    """
+    Ключи подписи и проверки JWT, загружаются один раз при импорте.
+
+    - HS256 (по умолчанию): оба ключа — SECRET_KEY в байтах (PyJWT
+      не перекодирует строку на каждом вызове);
+    - EdDSA: SECRET_KEY содержит приватный Ed25519-ключ в PEM,
+      публичный ключ для проверки выводится из него.
+    """
+    if settings.JWT_ALGORITHM == "EdDSA":
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+            Ed25519PrivateKey,
+        )
+        from cryptography.hazmat.primitives.serialization import (
+            load_pem_private_key,
+        )
+
+        private_key = load_pem_private_key(
+            settings.SECRET_KEY.encode("utf-8"), password=None
+        )
+        if not isinstance(private_key, Ed25519PrivateKey):
+            raise RuntimeError("JWT_ALGORITHM=EdDSA requires an Ed25519 SECRET_KEY")
+        return private_key, private_key.public_key()
+
+    secret = settings.SECRET_KEY.encode("utf-8")
+    return secret, secret
+
+
+JWT_SIGNING_KEY, JWT_VERIFICATION_KEY = _load_jwt_keys()
+
+# Аргументы jwt.decode, одинаковые для всех вызовов
+_JWT_ALGORITHMS = [settings.JWT_ALGORITHM]
+_DECODE_OPTIONS_NO_AUDIENCE = {"verify_aud": False}
+
+
+class _OrjsonPyJWT(jwt.PyJWT):
+    """
+    PyJWT с разбором и сериализацией payload через orjson вместо stdlib json.
+
+    Для коротких HS256-токенов основное время encode/decode уходит на JSON,
+    а не на HMAC. Вывод совпадает с PyJWT: компактный JSON в UTF-8.
+    """
+
+    def _encode_payload(
+        self,
+        payload: Dict[str, Any],
+        headers: Dict[str, Any] | None = None,
+        json_encoder: Any = None,
+    ) -> bytes:
+        if json_encoder is not None:
+            return super()._encode_payload(payload, headers, json_encoder)
+        return orjson.dumps(payload)
+
+    def _decode_payload(self, decoded: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            payload = orjson.loads(decoded["payload"])
+        except orjson.JSONDecodeError as exc:
+            raise jwt.DecodeError(f"Invalid payload string: {exc}") from exc
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        return payload
+
+
+_jwt = _OrjsonPyJWT()
+
+# Ключ для blake2b: выводим из SECRET_KEY, а не берём его префикс
+# (у PEM-ключей EdDSA префикс одинаковый).
+_TOKEN_DIGEST_KEY = hashlib.blake2b(
+    settings.SECRET_KEY.encode("utf-8"), digest_size=32
+).digest()
+
+# Уже проверенные токены: ключ — 16-байтный хеш токена и список audience
+_decoded_tokens: TTLCache[tuple[bytes, tuple[str, ...] | None], Dict[str, Any]] = (
+    TTLCache(
+        maxsize=settings.JWT_DECODE_CACHE_SIZE,
+        ttl=settings.JWT_DECODE_CACHE_TTL_SECONDS,
+    )
+)
 
 
 def hash_password(password: str) -> str:
@@ -36,7 +125,9 @@ def hash_password(password: str) -> str:
             "necessary (e.g. my_password[:72])"
         )
 
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode(
+        "ascii"
+    )
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
@@ -45,12 +136,39 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
     """
     if not plain_password or not password_hash:
         return False
-    return pwd_context.verify(plain_password, password_hash)
+
+    password_bytes = plain_password.encode("utf-8")
+    if len(password_bytes) > MAX_BCRYPT_BYTES:
+        return False
+
+    try:
+        return bcrypt.checkpw(password_bytes, password_hash.encode("ascii"))
+    except ValueError:
+        # Повреждённый или не-bcrypt хеш в БД
+        return False
+
+
+async def verify_password_async(plain_password: str, password_hash: str) -> bool:
+    """
+    verify_password в пуле bcrypt, не блокируя event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _BCRYPT_EXECUTOR, verify_password, plain_password, password_hash
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    hash_password в пуле bcrypt, не блокируя event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BCRYPT_EXECUTOR, hash_password, password)
 
 
 def create_access_token(
     user_id: str | int,
-    extra_claims: Dict[str, Any] | None = None,
+    extra_claims: Mapping[str, Any] | None = None,
     expires_minutes: int | None = None,
 ) -> str:
     """
@@ -61,14 +179,56 @@ def create_access_token(
     if extra_claims:
         to_encode.update(extra_claims)
 
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
-    to_encode["exp"] = expire
+    # PyJWT принимает числовые iat/exp — без промежуточных datetime
+    now = int(time.time())
+    to_encode["iat"] = now
+    to_encode["exp"] = now + (
+        expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    ) * 60
 
-    encoded_jwt = jwt.encode(
+    encoded_jwt = _jwt.encode(
         to_encode,
-        settings.SECRET_KEY,
+        JWT_SIGNING_KEY,
         algorithm=settings.JWT_ALGORITHM,
     )
     return encoded_jwt
+
+
+def decode_access_token(
+    token: str,
+    audience: list[str] | None = None,
+) -> Dict[str, Any]:
+    """
+    Проверка и декодирование JWT.
+
+    Результат кэшируется по хешу токена: клиент шлёт один и тот же токен
+    на каждый запрос, и повторно разбирать base64/JSON и проверять подпись
+    не нужно. Запись живёт не дольше exp токена, поэтому истёкший токен
+    из кэша не вернётся. Возвращаемый словарь общий для всех запросов —
+    не изменять. Без audience claim aud не проверяется.
+
+    Raises:
+        jwt.PyJWTError: токен невалиден или истёк.
+    """
+    cache_key = (
+        hashlib.blake2b(
+            token.encode("utf-8"), digest_size=16, key=_TOKEN_DIGEST_KEY
+        ).digest(),
+        tuple(audience) if audience is not None else None,
+    )
+
+    payload = _decoded_tokens.get(cache_key)
+    if payload is not None:
+        return payload
+
+    payload = _jwt.decode(
+        token,
+        JWT_VERIFICATION_KEY,
+        algorithms=_JWT_ALGORITHMS,
+        audience=audience,
+        options=_DECODE_OPTIONS_NO_AUDIENCE if audience is None else None,
+    )
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _decoded_tokens.set(cache_key, payload, ttl=exp - time.time())
+    return payload
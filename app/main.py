@@ -1,6 +1,8 @@
 """FastAPI application entrypoint."""
 
 import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -10,26 +12,37 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-from app.core.db import Base, engine
+from app.core.config import settings
 from app.core.logging import configure_logging, get_logger
 from app.modules.auth.router import router as auth_router
+from app.modules.chats.router import router as chats_router
+from app.modules.customers.router import router as customers_router
 from app.modules.files.router import router as files_router
+from app.modules.rag.router import router as rag_router
 
 configure_logging()
 logger = get_logger(__name__)
 
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if settings.ENV == "dev":
+        from app.core.init_db import init_db
+
+        init_db()
+
+    yield
+
 
 app = FastAPI(
     title="OSON Document Intelligence",
     description="Авторизация для административной панели и Telegram Mini App",
     swagger_ui_parameters={"persistAuthorization": True},
+    lifespan=lifespan,
 )
 
-from app.modules.chats.router import router as chats_router
-from app.modules.customers.router import router as customers_router
-from app.modules.rag.router import router as rag_router
-
+# Роутеры подключаются при импорте, а не в lifespan: маршруты и OpenAPI
+# доступны без запуска приложения (TestClient без with, генерация схемы)
 app.include_router(auth_router)
 app.include_router(files_router)
 app.include_router(customers_router)
@@ -41,4 +54,3 @@ app.include_router(rag_router)
 async def health_check():
     """Проверка работоспособности сервера."""
     return {"status": "ok", "service": "auditor-backend"}
-
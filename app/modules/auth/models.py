@@ -1,41 +1,98 @@
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import BigInteger, Boolean, DateTime, String
+from sqlalchemy import BigInteger, Boolean, Computed, DateTime, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
+from uuid_extensions import uuid7
 
 from app.core.db import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    # Значения server_default возвращаются через RETURNING того же INSERT
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
 
     email: Mapped[str | None] = mapped_column(
         String, unique=True, index=True, nullable=True
     )
+    # Поиск по email без учёта регистра — обычное равенство по индексу,
+    # значение считает Postgres (в INSERT/UPDATE не передаётся)
+    email_lower: Mapped[str | None] = mapped_column(
+        String, Computed("lower(email)", persisted=True), unique=True, index=True
+    )
 
     full_name: Mapped[str | None] = mapped_column(String, nullable=True)
 
     password_hash: Mapped[str | None] = mapped_column(String, nullable=True)
 
-    telegram_phone: Mapped[str | None] = mapped_column(String, unique=True, index=True)
-    telegram_user_id: Mapped[int | None] = mapped_column(
-        BigInteger, unique=True, index=True
-    )
+    # Уникальность — частичными индексами ниже (у большинства строк NULL)
+    telegram_phone: Mapped[str | None] = mapped_column(String)
+    telegram_user_id: Mapped[int | None] = mapped_column(BigInteger)
 
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
     )
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """
+    Неизменяемый снимок пользователя для зависимостей авторизации.
+
+    Не привязан к сессии SQLAlchemy, поэтому его можно держать в кэше
+    между запросами.
+    """
+
+    id: uuid.UUID
+    email: str | None
+    full_name: str | None
+    telegram_phone: str | None
+    telegram_user_id: int | None
+    is_admin: bool
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            telegram_phone=user.telegram_phone,
+            telegram_user_id=user.telegram_user_id,
+            is_admin=user.is_admin,
+            is_active=user.is_active,
+        )
+
+
+# Для has_admins: EXISTS по маленькому индексу только с администраторами
+Index("ix_users_is_admin", User.id, postgresql_where=User.is_admin.is_(True))
+# Администраторы без Telegram в индексы не попадают
+Index(
+    "ix_users_telegram_phone",
+    User.telegram_phone,
+    unique=True,
+    postgresql_where=User.telegram_phone.is_not(None),
+)
+Index(
+    "ix_users_telegram_user_id",
+    User.telegram_user_id,
+    unique=True,
+    postgresql_where=User.telegram_user_id.is_not(None),
+)
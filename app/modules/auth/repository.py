@@ -1,36 +1,134 @@
 """Persistence layer for authentication and user management."""
 
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Row, exists, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.auth.models import User
 
+# Ключ pg_advisory_xact_lock для создания первого администратора
+_BOOTSTRAP_ADMIN_LOCK_ID = 0x61646D696E  # "admin"
+
 
 class UserRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_by_id(self, user_id: str) -> User | None:
-        return self.db.get(User, user_id)
+    async def get_by_id(self, user_id: UUID) -> User | None:
+        return await self.db.get(User, user_id)
 
-    def get_by_email(self, email: str) -> User | None:
+    async def get_by_email(self, email: str) -> User | None:
         if email is None:
             return None
-        stmt = select(User).where(func.lower(User.email) == email.lower())
-        return self.db.scalar(stmt)
+        stmt = select(User).where(User.email_lower == email.lower())
+        return await self.db.scalar(stmt)
 
-    def get_by_phone(self, phone: str) -> User | None:
+    async def get_by_phone(self, phone: str) -> User | None:
         if phone is None:
             return None
         stmt = select(User).where(User.telegram_phone == phone)
-        return self.db.scalar(stmt)
+        return await self.db.scalar(stmt)
+
+    # Для логина достаточно четырёх колонок: Core-строка вместо ORM-объекта
+    # (без identity map и инструментирования атрибутов)
+    _AUTH_COLUMNS = (User.id, User.password_hash, User.is_active, User.is_admin)
+
+    async def get_auth_row_by_email(self, email: str) -> Row | None:
+        if email is None:
+            return None
+        stmt = select(*self._AUTH_COLUMNS).where(User.email_lower == email.lower())
+        return (await self.db.execute(stmt)).first()
+
+    async def get_auth_row_by_phone(self, phone: str) -> Row | None:
+        if phone is None:
+            return None
+        stmt = select(*self._AUTH_COLUMNS).where(User.telegram_phone == phone)
+        return (await self.db.execute(stmt)).first()
+
+    async def find_conflict(
+        self, email: str | None, phone: str | None
+    ) -> tuple[bool, bool] | None:
+        """
+        Один запрос на уникальность email и телефона перед созданием.
 
-    def has_admins(self) -> bool:
-        stmt = select(func.count()).select_from(User).where(User.is_admin.is_(True))
-        return bool(self.db.scalar(stmt))
+        Возвращает (email занят, телефон занят) для первой найденной строки
+        или None, если конфликтов нет.
+        """
+        # Сравнение с None скомпилировалось бы в IS NULL и совпало бы со
+        # всеми строками без email/телефона — отсутствующее поле не совпадает
+        email_match = (
+            User.email_lower == email.lower() if email else literal(False)
+        )
+        phone_match = User.telegram_phone == phone if phone else literal(False)
+        if not email and not phone:
+            return None
+
+        stmt = (
+            select(
+                email_match.label("email_match"),
+                phone_match.label("phone_match"),
+            )
+            .where(or_(email_match, phone_match))
+            .limit(1)
+        )
+        row = (await self.db.execute(stmt)).first()
+        if row is None:
+            return None
+        return bool(row.email_match), bool(row.phone_match)
 
-    def create(self, user: User) -> User:
+    async def has_admins(self) -> bool:
+        # EXISTS останавливается на первой найденной строке, COUNT считает все
+        stmt = select(literal(True)).where(exists().where(User.is_admin.is_(True)))
+        return await self.db.scalar(stmt) is True
+
+    async def create(self, user: User) -> User:
+        """
+        Raises:
+            IntegrityError: email или телефон заняты (уникальные индексы).
+        """
+        # created_at/updated_at приходят в RETURNING того же INSERT
+        # (eager_defaults), сессия не истекает объекты при commit —
+        # повторный SELECT через refresh не нужен
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise
+        return user
+
+    async def create_first_admin(self, values: dict[str, Any]) -> User | None:
+        """
+        INSERT ... SELECT ... WHERE NOT EXISTS (администратор) RETURNING.
+
+        Сам по себе NOT EXISTS гонку не закрывает: в READ COMMITTED два
+        параллельных INSERT не видят незакоммиченных строк друг друга, а
+        уникального ограничения на «есть администратор» нет. Поэтому вставка
+        идёт под транзакционной advisory-блокировкой: второй запрос ждёт
+        commit первого и уже видит его администратора.
+
+        Возвращает None, если администратор уже есть или email/телефон заняты.
+        """
+        # Блокировка снимается при commit/rollback транзакции
+        await self.db.execute(
+            select(func.pg_advisory_xact_lock(_BOOTSTRAP_ADMIN_LOCK_ID))
+        )
+
+        columns = User.__table__.c
+        guarded_values = select(
+            *(literal(value, columns[name].type) for name, value in values.items())
+        ).where(~exists().where(User.is_admin.is_(True)))
+
+        stmt = (
+            insert(User)
+            .from_select(list(values), guarded_values)
+            .on_conflict_do_nothing()
+            .returning(User)
+        )
+        user = (await self.db.scalars(stmt)).first()
+        await self.db.commit()
         return user
@@ -1,12 +1,14 @@
+from ipaddress import ip_address, ip_network
+
 import jwt
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.db import get_db
-from app.modules.auth.models import User
-from app.modules.auth.repository import UserRepository
+from app.core.db import get_async_db
+from app.core.security import decode_access_token
+from app.modules.auth.models import UserSnapshot
 from app.modules.auth.schemas import (
     AdminLoginRequest,
     TelegramLoginRequest,
@@ -22,10 +24,47 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/admin/login")
 
 
-def _get_auth_service(db: Session = Depends(get_db)) -> AuthService:
+def _get_auth_service(db: AsyncSession = Depends(get_async_db)) -> AuthService:
+    # Зависимость кэшируется FastAPI в пределах запроса: get_current_user
+    # и обработчик маршрута получают один и тот же сервис
     return AuthService(db)
 
 
+_TRUSTED_PROXIES = [ip_network(proxy) for proxy in settings.TRUSTED_PROXIES]
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _TRUSTED_PROXIES)
+
+
+def _client_ip(request: Request) -> str | None:
+    """
+    IP клиента для лимита неудачных входов.
+
+    За доверенным прокси request.client — сам прокси, и все клиенты делили бы
+    один счётчик. Тогда X-Forwarded-For читается справа налево до первого
+    адреса, который не является доверенным прокси (левые элементы может
+    подставить сам клиент).
+    """
+    peer = request.client.host if request.client else None
+    if peer is None or not _is_trusted_proxy(peer):
+        return peer
+
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded:
+        return peer
+
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
 def _decode_token(
     token: str,
     audience: list[str] | None = None,
@@ -34,13 +73,15 @@ def _decode_token(
     Универсальная функция декодирования JWT.
     Если audience передан, PyJWT проверит, что aud в токене входит в этот список.
     """
-    try:
-        return jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM],
-            audience=audience,
+    # JWS compact: header.payload.signature. Мусор отсекаем до base64/JSON
+    if token.count(".") != 2:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
         )
+
+    try:
+        return decode_access_token(token, audience=audience)
     except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,15 +89,18 @@ def _decode_token(
         )
 
 
-def get_current_user(
+async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+    service: AuthService = Depends(_get_auth_service),
+) -> UserSnapshot:
     # Разрешаем оба типа токенов: админский и сотрудника
     payload = _decode_token(
         token,
         audience=["sec.asteradigital.kz", "divan.asteradigital.kz"],
     )
+    # Проверенный payload нужен get_current_admin — без повторного decode
+    request.state.jwt_payload = payload
 
     user_id: str | None = payload.get("sub")
     if not user_id:
@@ -65,8 +109,9 @@ def get_current_user(
             detail="Invalid token payload",
         )
 
-    repo = UserRepository(db)
-    user = repo.get_by_id(user_id)
+    # Снимок берётся из кэша AuthService; сессия открывает соединение
+    # только при промахе
+    user = await service.get_user_snapshot(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,16 +128,16 @@ def get_current_user(
 
 
 def get_current_admin(
-    token: str = Depends(oauth2_scheme),
-    user: User = Depends(get_current_user),
-) -> User:
+    request: Request,
+    user: UserSnapshot = Depends(get_current_user),
+) -> UserSnapshot:
     """
     Требуется токен с aud = sec.asteradigital.kz и user.is_admin = True.
+
+    Подпись и срок действия уже проверил get_current_user, здесь
+    сверяется только audience из сохранённого payload.
     """
-    payload = _decode_token(
-        token,
-        audience=["sec.asteradigital.kz"],  # только админский audience
-    )
+    payload = request.state.jwt_payload
     if payload.get("aud") != "sec.asteradigital.kz":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -107,7 +152,9 @@ def get_current_admin(
     return user
 
 
-def get_current_employee(user: User = Depends(get_current_user)) -> User:
+def get_current_employee(
+    user: UserSnapshot = Depends(get_current_user),
+) -> UserSnapshot:
 
     
     if user.is_admin:
@@ -125,7 +172,8 @@ def get_current_employee(user: User = Depends(get_current_user)) -> User:
     response_model=TokenResponse,
     summary="Админ: вход по email и паролю (OAuth2 password flow)",
 )
-def admin_login(
+async def admin_login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     service: AuthService = Depends(_get_auth_service),
 ):
@@ -134,7 +182,7 @@ def admin_login(
     password = form_data.password
 
     try:
-        token, _ = service.login_admin(email, password)
+        token, _ = await service.login_admin(email, password, _client_ip(request))
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -148,11 +196,15 @@ def admin_login(
     response_model=TokenResponse,
     summary="Сотрудник: вход по телефону и паролю",
 )
-def telegram_login(
-    payload: TelegramLoginRequest, service: AuthService = Depends(_get_auth_service)
+async def telegram_login(
+    request: Request,
+    payload: TelegramLoginRequest,
+    service: AuthService = Depends(_get_auth_service),
 ):
     try:
-        token, _ = service.login_telegram(payload.phone, payload.password)
+        token, _ = await service.login_telegram(
+            payload.phone, payload.password, _client_ip(request)
+        )
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -166,13 +218,13 @@ def telegram_login(
     response_model=UserBase,
     summary="Создание сотрудника или администратора",
 )
-def create_user(
+async def create_user(
     payload: UserCreateRequest,
     service: AuthService = Depends(_get_auth_service),
-    _: User = Depends(get_current_admin),
+    _: UserSnapshot = Depends(get_current_admin),
 ):
     try:
-        return service.create_user(payload)
+        return await service.create_user(payload)
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -185,11 +237,11 @@ def create_user(
     response_model=UserBase,
     summary="Инициализация первого администратора",
 )
-def bootstrap_admin(
+async def bootstrap_admin(
     payload: UserCreateRequest, service: AuthService = Depends(_get_auth_service)
 ):
     try:
-        return service.bootstrap_admin(payload)
+        return await service.bootstrap_admin(payload)
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -198,5 +250,5 @@ def bootstrap_admin(
 
 
 @router.get("/me", response_model=UserBase, summary="Проверка авторизации")
-def me(user: User = Depends(get_current_user)):
+async def me(user: UserSnapshot = Depends(get_current_user)):
     return user
@@ -1,6 +1,8 @@
 """Pydantic schemas for authentication endpoints."""
-<<<<<<< HEAD
-from pydantic import BaseModel, EmailStr, Field, validator
+from typing import Annotated
+from uuid import UUID
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, EmailStr, Field
 
 # Максимальная длина пароля для bcrypt (72 байта)
 # Для ASCII символов это 72 символа, для Unicode может быть меньше
@@ -9,20 +11,28 @@ MAX_PASSWORD_BYTES = 72
 
 def validate_password_length(value: str) -> str:
     """Проверка длины пароля в байтах (bcrypt ограничение 72 байта)."""
-    if isinstance(value, str):
-        password_bytes = value.encode("utf-8")
-        if len(password_bytes) > MAX_PASSWORD_BYTES:
-            raise ValueError(
-                f"Пароль слишком длинный. Максимум {MAX_PASSWORD_BYTES} байт "
-                f"({len(value)} символов). Для ASCII это примерно {MAX_PASSWORD_BYTES} символов."
-            )
+    # Длину в символах уже проверил max_length; для ASCII байты = символы
+    if value.isascii():
+        return value
+
+    password_bytes = value.encode("utf-8")
+    if len(password_bytes) > MAX_PASSWORD_BYTES:
+        raise ValueError(
+            f"Пароль слишком длинный. Максимум {MAX_PASSWORD_BYTES} байт "
+            f"({len(value)} символов). Для ASCII это примерно {MAX_PASSWORD_BYTES} символов."
+        )
     return value
-=======
 
-from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
->>>>>>> origin/test
+# Тела auth-запросов фиксированы: лишние поля — ошибка, без приведения типов
+_STRICT_REQUEST_CONFIG = ConfigDict(extra="forbid", strict=True, defer_build=False)
+
+# min/max_length проверяет pydantic-core, Python-валидатор — только байты
+Password = Annotated[
+    str,
+    Field(min_length=8, max_length=MAX_PASSWORD_BYTES),
+    AfterValidator(validate_password_length),
+]
 
 
 class TokenResponse(BaseModel):
@@ -31,45 +41,37 @@ class TokenResponse(BaseModel):
 
 
 class AdminLoginRequest(BaseModel):
+    model_config = _STRICT_REQUEST_CONFIG
+
     email: EmailStr
-    password: str = Field(
-        min_length=8,
-        max_length=72,  # Примерная длина для ASCII
+    password: Password = Field(
         description="Административный пароль (минимум 8 символов, максимум 72 байта)"
     )
 
-    @validator("password")
-    def validate_password(cls, v: str) -> str:
-        return validate_password_length(v)
-
 
 class TelegramLoginRequest(BaseModel):
-    phone: str = Field(description="Номер телефона в формате Telegram")
-    password: str = Field(min_length=8, max_length=72)
+    model_config = _STRICT_REQUEST_CONFIG
 
-    @validator("password")
-    def validate_password(cls, v: str) -> str:
-        return validate_password_length(v)
+    phone: str = Field(description="Номер телефона в формате Telegram")
+    password: Password
 
 
 class UserCreateRequest(BaseModel):
+    model_config = _STRICT_REQUEST_CONFIG
+
     email: EmailStr | None = None
     full_name: str | None = None
-    password: str = Field(
-        min_length=8,
-        max_length=72,
+    password: Password = Field(
         description="Пароль (минимум 8 символов, максимум 72 байта)"
     )
     telegram_phone: str | None = None
     telegram_user_id: int | None = None
     is_admin: bool = False
 
-    @validator("password")
-    def validate_password(cls, v: str) -> str:
-        return validate_password_length(v)
-
 
 class UserBase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     email: EmailStr | None = None
     full_name: str | None = None
@@ -78,5 +80,3 @@ class UserBase(BaseModel):
     is_admin: bool
     is_active: bool
 
-    class Config:
-        orm_mode = True
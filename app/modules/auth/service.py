@@ -1,57 +1,167 @@
 """Business logic for authentication flows."""
-from sqlalchemy.orm import Session
-
-from app.core.security import create_access_token, hash_password, verify_password
-from app.modules.auth.models import User
+import hashlib
+from types import MappingProxyType
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid_extensions import uuid7
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    hash_password_async,
+    verify_password_async,
+)
+from app.modules.auth.models import User, UserSnapshot
 from app.modules.auth.repository import UserRepository
 from app.modules.auth.schemas import UserCreateRequest
 
+# Неизменяемые claims по ролям: при логине меняются только sub/iat/exp
+_ADMIN_CLAIMS = MappingProxyType({"role": "admin", "aud": "sec.asteradigital.kz"})
+_EMPLOYEE_CLAIMS = MappingProxyType(
+    {"role": "employee", "aud": "divan.asteradigital.kz"}
+)
 
-class AuthService:
-    def __init__(self, db: Session):
-        self.db = db
-        self.repo = UserRepository(db)
+# Снимки пользователей по id: get_current_user не ходит в БД на каждый запрос
+_user_cache: TTLCache[str, UserSnapshot] = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_cached_user(user_id: str | UUID) -> None:
+    """Сбросить снимок пользователя после изменения is_active / is_admin."""
+    _user_cache.pop(str(user_id))
+
+
+# Неудачные входы по (IP, хеш логина): сам email/телефон в памяти не хранится.
+# Каждая новая неудача продлевает окно
+_failed_logins: TTLCache[tuple[str | None, bytes], int] = TTLCache(
+    maxsize=settings.LOGIN_FAILURE_CACHE_SIZE,
+    ttl=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+)
+
+
+def _login_key(client_ip: str | None, login: str) -> tuple[str | None, bytes]:
+    digest = hashlib.blake2b(login.lower().encode("utf-8"), digest_size=16)
+    return client_ip, digest.digest()
+
+
+def _ensure_not_throttled(key: tuple[str | None, bytes]) -> None:
+    if (_failed_logins.get(key) or 0) >= settings.LOGIN_MAX_FAILURES:
+        raise ValueError("Invalid credentials")
+
+
+def _register_failed_login(key: tuple[str | None, bytes]) -> None:
+    # Одним шагом под блокировкой кэша: параллельные неудачи не теряются
+    _failed_logins.increment(key)
 
-    def login_admin(self, email: str, password: str) -> tuple[str, User]:
-        user = self.repo.get_by_email(email)
-        if not user or not user.is_admin:
-            raise ValueError("Invalid email or password")
 
-        self._ensure_active(user)
-        self._validate_password(password, user)
+def _get_repo(db: AsyncSession) -> UserRepository:
+    """Один репозиторий на сессию (сессия живёт в пределах запроса)."""
+    repo = db.info.get("user_repo")
+    if repo is None:
+        repo = db.info["user_repo"] = UserRepository(db)
+    return repo
+
+
+class AuthService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = _get_repo(db)
+
+    async def get_user_snapshot(self, user_id: str) -> UserSnapshot | None:
+        """Пользователь по id из кэша; при промахе — из БД."""
+        snapshot = _user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            return None
+
+        user = await self.repo.get_by_id(user_uuid)
+        if user is None:
+            return None
+
+        snapshot = UserSnapshot.from_user(user)
+        _user_cache.set(user_id, snapshot)
+        return snapshot
+
+    async def login_admin(
+        self, email: str, password: str, client_ip: str | None = None
+    ) -> tuple[str, Row]:
+        key = _login_key(client_ip, email)
+        _ensure_not_throttled(key)
+        try:
+            user = await self.repo.get_auth_row_by_email(email)
+            if not user or not user.is_admin:
+                raise ValueError("Invalid email or password")
+
+            self._ensure_active(user)
+            await self._validate_password(password, user)
+        except ValueError:
+            _register_failed_login(key)
+            raise
+        _failed_logins.pop(key)
 
         token = create_access_token(
             user.id,
-            extra_claims={"role": "admin", "aud": "sec.asteradigital.kz"},
+            extra_claims=_ADMIN_CLAIMS,
         )
         return token, user
 
-    def login_telegram(self, phone: str, password: str) -> tuple[str, User]:
-        user = self.repo.get_by_phone(phone)
-        if not user:
-            raise ValueError("Invalid phone or password")
-
-        self._ensure_active(user)
-        self._validate_password(password, user)
+    async def login_telegram(
+        self, phone: str, password: str, client_ip: str | None = None
+    ) -> tuple[str, Row]:
+        key = _login_key(client_ip, phone)
+        _ensure_not_throttled(key)
+        try:
+            user = await self.repo.get_auth_row_by_phone(phone)
+            if not user:
+                raise ValueError("Invalid phone or password")
+
+            self._ensure_active(user)
+            await self._validate_password(password, user)
+        except ValueError:
+            _register_failed_login(key)
+            raise
+        _failed_logins.pop(key)
 
         token = create_access_token(
             user.id,
-            extra_claims={"role": "employee", "aud": "divan.asteradigital.kz"},
+            extra_claims=_EMPLOYEE_CLAIMS,
         )
         return token, user
 
-    def create_user(self, payload: UserCreateRequest) -> User:
+    async def create_user(
+        self, payload: UserCreateRequest, *, check_conflicts: bool = True
+    ) -> User:
+        """
+        Создание сотрудника или администратора.
+
+        check_conflicts=False пропускает предварительный SELECT: занятые
+        email/телефон отсекут уникальные индексы (один INSERT на пользователя
+        для массовой загрузки).
+        """
         # Сотруднику обязательно нужен телефон Telegram
         if payload.is_admin is False and not payload.telegram_phone:
             raise ValueError("Telegram phone is required for employee accounts")
 
-        # Уникальность e-mail
-        if payload.email and self.repo.get_by_email(payload.email):
-            raise ValueError("User with this email already exists")
-
-        # Уникальность телефона
-        if payload.telegram_phone and self.repo.get_by_phone(payload.telegram_phone):
-            raise ValueError("User with this phone already exists")
+        # Уникальность e-mail и телефона — одним запросом
+        if check_conflicts:
+            conflict = await self.repo.find_conflict(
+                payload.email, payload.telegram_phone
+            )
+            if conflict is not None:
+                email_taken, _ = conflict
+                if email_taken:
+                    raise ValueError("User with this email already exists")
+                raise ValueError("User with this phone already exists")
 
         new_user = User(
             email=payload.email,
@@ -60,31 +170,45 @@ class AuthService:
             telegram_user_id=payload.telegram_user_id,
             is_admin=payload.is_admin,
             is_active=True,
-            password_hash=hash_password(payload.password),
+            password_hash=await hash_password_async(payload.password),
         )
-        return self.repo.create(new_user)
+        try:
+            return await self.repo.create(new_user)
+        except IntegrityError:
+            # Параллельное создание с тем же email/телефоном после проверки
+            raise ValueError("User with this email or phone already exists")
 
-    def bootstrap_admin(self, payload: UserCreateRequest) -> User:
+    async def bootstrap_admin(self, payload: UserCreateRequest) -> User:
         """Создание первого администратора (инициализация системы)."""
-        if self.repo.has_admins():
-            raise ValueError("Admin already exists")
-
-        # ВАЖНО: не дублируем is_admin, а обновляем.
-        admin_payload = payload.copy(update={"is_admin": True})
-        # Альтернатива:
-        # admin_payload = UserCreateRequest(
-        #     **payload.dict(exclude={"is_admin"}),
-        #     is_admin=True,
-        # )
+        user = await self.repo.create_first_admin(
+            {
+                "id": uuid7(),
+                "email": payload.email,
+                "full_name": payload.full_name,
+                "telegram_phone": payload.telegram_phone,
+                "telegram_user_id": payload.telegram_user_id,
+                # ВАЖНО: администратор независимо от payload.is_admin
+                "is_admin": True,
+                "is_active": True,
+                "password_hash": await hash_password_async(payload.password),
+            }
+        )
+        if user is not None:
+            return user
 
-        return self.create_user(admin_payload)
+        # Вставка не прошла — уточняем причину (редкий путь)
+        if await self.repo.has_admins():
+            raise ValueError("Admin already exists")
+        raise ValueError("User with this email or phone already exists")
 
     @staticmethod
-    def _ensure_active(user: User) -> None:
+    def _ensure_active(user: User | Row) -> None:
         if not user.is_active:
             raise ValueError("User disabled")
 
     @staticmethod
-    def _validate_password(password: str, user: User) -> None:
-        if not user.password_hash or not verify_password(password, user.password_hash):
+    async def _validate_password(password: str, user: User | Row) -> None:
+        if not user.password_hash:
+            raise ValueError("Invalid credentials")
+        if not await verify_password_async(password, user.password_hash):
             raise ValueError("Invalid credentials")
@@ -1,5 +1,4 @@
 import enum
-import uuid
 from datetime import datetime
 
 from sqlalchemy import (
@@ -8,11 +7,13 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     String,
     Text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
+from uuid_extensions import uuid7
 
 from app.core.db import Base
 
@@ -26,15 +27,16 @@ class SenderType(str, enum.Enum):
 class Chat(Base):
     __tablename__ = "chats"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
 
     customer_id = Column(UUID(as_uuid=True), ForeignKey("customers.id"), nullable=False)
     created_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     title = Column(String, nullable=True)
 
-    # Кэш контекста для Gemini (можно хранить JSON-строку)
-    context_cache = Column(Text, nullable=True)
+    # Кэш контекста для Gemini: словарь пишется как есть, Postgres хранит
+    # его в бинарном JSONB (сериализация — orjson на уровне движка)
+    context_cache = Column(JSONB, nullable=True)
 
     is_archived = Column(Boolean, default=False, nullable=False)
 
@@ -59,7 +61,7 @@ class Chat(Base):
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     chat_id = Column(UUID(as_uuid=True), ForeignKey("chats.id"), nullable=False)
 
     sender_type = Column(Enum(SenderType), nullable=False)
@@ -74,3 +76,8 @@ class ChatMessage(Base):
     chat = relationship("Chat", back_populates="messages")
     sender = relationship("User")
 
+
+# list_chats: WHERE customer_id ORDER BY created_at DESC — обход индекса без сортировки
+Index("ix_chats_customer_created", Chat.customer_id, Chat.created_at.desc())
+# Сообщения чата по времени (Chat.messages, выборка последних сообщений)
+Index("ix_chat_messages_chat_created", ChatMessage.chat_id, ChatMessage.created_at)
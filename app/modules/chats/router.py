@@ -1,10 +1,12 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, selectinload
 
-from app.core.db import get_db
-from app.modules.auth.models import User
+from app.core.db import get_async_db
+from app.modules.auth.models import UserSnapshot
 from app.modules.auth.router import get_current_employee
 from app.modules.chats.models import Chat, ChatMessage, SenderType
 from app.modules.chats.schemas import (
@@ -19,12 +21,12 @@ from app.modules.customers.models import Customer
 router = APIRouter(prefix="/customers/{customer_id}/chats", tags=["chats"])
 
 
-def _ensure_customer_access(
-    db: Session,
+async def _ensure_customer_access(
+    db: AsyncSession,
     customer_id: UUID,
-    user: User,
+    user: UserSnapshot,
 ) -> Customer:
-    customer = db.query(Customer).get(customer_id)
+    customer = await db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found"
@@ -36,18 +38,46 @@ def _ensure_customer_access(
     return customer
 
 
+async def _get_chat_with_access(
+    db: AsyncSession,
+    customer_id: UUID,
+    chat_id: UUID,
+    user: UserSnapshot,
+    *options,
+) -> Chat:
+    """
+    Чат и его заказчик одним запросом (JOIN) с проверкой доступа.
+    """
+    stmt = (
+        select(Chat)
+        .join(Chat.customer)
+        .options(contains_eager(Chat.customer), *options)
+        .where(Chat.id == chat_id, Customer.id == customer_id)
+    )
+    chat = await db.scalar(stmt)
+    if not chat:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found"
+        )
+
+    if chat.customer.assigned_employee_id != user.id and not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    return chat
+
+
 @router.post(
     "",
     response_model=ChatBase,
     summary="Создать чат для заказчика",
 )
-def create_chat(
+async def create_chat(
     customer_id: UUID,
     payload: ChatCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_employee),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_employee),
 ):
-    _ensure_customer_access(db, customer_id, current_user)
+    await _ensure_customer_access(db, customer_id, current_user)
 
     chat = Chat(
         customer_id=customer_id,
@@ -55,8 +85,9 @@ def create_chat(
         title=payload.title,
     )
     db.add(chat)
-    db.commit()
-    db.refresh(chat)
+    # id и даты — Python-дефолты, уже проставлены при flush; сессия не
+    # истекает объекты при commit, повторный SELECT не нужен
+    await db.commit()
     return chat
 
 
@@ -65,20 +96,19 @@ def create_chat(
     response_model=list[ChatBase],
     summary="Список чатов заказчика",
 )
-def list_chats(
+async def list_chats(
     customer_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_employee),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_employee),
 ):
-    _ensure_customer_access(db, customer_id, current_user)
+    await _ensure_customer_access(db, customer_id, current_user)
 
-    chats = (
-        db.query(Chat)
-        .filter(Chat.customer_id == customer_id)
+    stmt = (
+        select(Chat)
+        .where(Chat.customer_id == customer_id)
         .order_by(Chat.created_at.desc())
-        .all()
     )
-    return chats
+    return (await db.scalars(stmt)).all()
 
 
 @router.get(
@@ -86,21 +116,16 @@ def list_chats(
     response_model=ChatWithMessages,
     summary="Получить чат с сообщениями",
 )
-def get_chat(
+async def get_chat(
     customer_id: UUID,
     chat_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_employee),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_employee),
 ):
-    _ensure_customer_access(db, customer_id, current_user)
-
-    chat = db.query(Chat).get(chat_id)
-    if not chat or chat.customer_id != customer_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found"
-        )
-
-    return chat
+    # Сообщения — одним IN-запросом сразу, а не ленивой загрузкой при сериализации
+    return await _get_chat_with_access(
+        db, customer_id, chat_id, current_user, selectinload(Chat.messages)
+    )
 
 
 @router.post(
@@ -108,20 +133,14 @@ def get_chat(
     response_model=ChatMessageBase,
     summary="Отправить сообщение в чат (сотрудник)",
 )
-def send_message(
+async def send_message(
     customer_id: UUID,
     chat_id: UUID,
     payload: ChatMessageCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_employee),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_employee),
 ):
-    _ensure_customer_access(db, customer_id, current_user)
-
-    chat = db.query(Chat).get(chat_id)
-    if not chat or chat.customer_id != customer_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found"
-        )
+    await _get_chat_with_access(db, customer_id, chat_id, current_user)
 
     message = ChatMessage(
         chat_id=chat_id,
@@ -131,8 +150,7 @@ def send_message(
         content=payload.content,
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.commit()
 
     # Здесь позже можно вызывать Gemini и сохранять ответ как отдельное сообщение:
     # assistant_message = ChatMessage(...)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.modules.chats.models import SenderType
 
@@ -11,6 +11,8 @@ class ChatCreate(BaseModel):
 
 
 class ChatBase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     customer_id: UUID
     created_by_id: UUID
@@ -19,15 +21,14 @@ class ChatBase(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
-
 
 class ChatMessageCreate(BaseModel):
     content: str = Field(..., description="Текст сообщения сотрудника")
 
 
 class ChatMessageBase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     chat_id: UUID
     sender_type: SenderType
@@ -36,10 +37,6 @@ class ChatMessageBase(BaseModel):
     content: str
     created_at: datetime
 
-    class Config:
-        orm_mode = True
-
 
 class ChatWithMessages(ChatBase):
     messages: list[ChatMessageBase]
-
@@ -1,10 +1,10 @@
 import enum
-import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, String
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from uuid_extensions import uuid7
 
 from app.core.db import Base
 
@@ -17,7 +17,7 @@ class CustomerStatus(str, enum.Enum):
 class Customer(Base):
     __tablename__ = "customers"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
 
     company_name = Column(String, nullable=False)
     short_description = Column(String, nullable=True)
@@ -47,3 +47,10 @@ class Customer(Base):
         "Chat", back_populates="customer", cascade="all, delete-orphan"
     )
 
+
+# list_my_customers: WHERE assigned_employee_id ORDER BY created_at DESC
+Index(
+    "ix_customers_employee_created",
+    Customer.assigned_employee_id,
+    Customer.created_at.desc(),
+)
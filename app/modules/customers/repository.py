@@ -1,49 +0,0 @@
-import enum
-import uuid
-from datetime import datetime
-
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, String
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-
-from app.core.db import Base
-
-
-class CustomerStatus(str, enum.Enum):
-    IN_PROGRESS = "IN_PROGRESS"
-    COMPLETED = "COMPLETED"
-
-
-class Customer(Base):
-    __tablename__ = "customers"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-
-    company_name = Column(String, nullable=False)
-    short_description = Column(String, nullable=True)
-
-    assigned_employee_id = Column(
-        UUID(as_uuid=True),
-        ForeignKey("users.id"),
-        nullable=False,
-    )
-
-    status = Column(
-        Enum(CustomerStatus),
-        nullable=False,
-        default=CustomerStatus.IN_PROGRESS,
-    )
-
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(
-        DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
-        nullable=False,
-    )
-
-    assigned_employee = relationship("User")  # app.modules.auth.models.User
-    chats = relationship(
-        "Chat", back_populates="customer", cascade="all, delete-orphan"
-    )
-
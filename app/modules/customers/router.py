@@ -1,10 +1,11 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_db
-from app.modules.auth.models import User
+from app.core.db import get_async_db
+from app.modules.auth.models import UserSnapshot
 from app.modules.auth.router import get_current_admin, get_current_employee
 from app.modules.customers.models import Customer
 from app.modules.customers.schemas import CustomerBase, CustomerCreate, CustomerUpdate
@@ -17,10 +18,10 @@ router = APIRouter(prefix="/customers", tags=["customers"])
     response_model=CustomerBase,
     summary="Создать заказчика",
 )
-def create_customer(
+async def create_customer(
     payload: CustomerCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_employee),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_employee),
 ):
     # можно добавить проверку, что current_user имеет право назначать на другого
     customer = Customer(
@@ -30,8 +31,9 @@ def create_customer(
         status=payload.status,
     )
     db.add(customer)
-    db.commit()
-    db.refresh(customer)
+    # id и даты — Python-дефолты, уже проставлены при flush; сессия не
+    # истекает объекты при commit, повторный SELECT не нужен
+    await db.commit()
     return customer
 
 
@@ -40,17 +42,16 @@ def create_customer(
     response_model=list[CustomerBase],
     summary="Список заказчиков текущего сотрудника",
 )
-def list_my_customers(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_employee),
+async def list_my_customers(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_employee),
 ):
-    customers = (
-        db.query(Customer)
-        .filter(Customer.assigned_employee_id == current_user.id)
+    stmt = (
+        select(Customer)
+        .where(Customer.assigned_employee_id == current_user.id)
         .order_by(Customer.created_at.desc())
-        .all()
     )
-    return customers
+    return (await db.scalars(stmt)).all()
 
 
 @router.get(
@@ -58,12 +59,12 @@ def list_my_customers(
     response_model=CustomerBase,
     summary="Получить заказчика",
 )
-def get_customer(
+async def get_customer(
     customer_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_employee),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_employee),
 ):
-    customer = db.query(Customer).get(customer_id)
+    customer = await db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found"
@@ -81,13 +82,13 @@ def get_customer(
     response_model=CustomerBase,
     summary="Обновить заказчика",
 )
-def update_customer(
+async def update_customer(
     customer_id: UUID,
     payload: CustomerUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_employee),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_employee),
 ):
-    customer = db.query(Customer).get(customer_id)
+    customer = await db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found"
@@ -100,7 +101,6 @@ def update_customer(
     for key, value in data.items():
         setattr(customer, key, value)
 
-    db.commit()
-    db.refresh(customer)
+    await db.commit()
     return customer
 
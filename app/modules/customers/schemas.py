@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.modules.customers.models import CustomerStatus
 
@@ -21,6 +21,8 @@ class CustomerUpdate(BaseModel):
 
 
 class CustomerBase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     company_name: str
     short_description: str | None
@@ -28,7 +30,3 @@ class CustomerBase(BaseModel):
     status: CustomerStatus
     created_at: datetime
     updated_at: datetime
-
-    class Config:
-        orm_mode = True
-
@@ -2,10 +2,17 @@ from __future__ import annotations
 
 import io
 import logging
+import multiprocessing
+import os
 import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Final
 
 from docx import Document
+from lxml import etree
 from pypdf import PdfReader
 
 from app.core.logging import get_logger
@@ -28,6 +35,14 @@ TEXT_MIME_TYPES: Final[set[str]] = {
 }
 
 
+# NUL (Postgres его не принимает) и прочие управляющие символы, кроме \t,
+# \n и \r: str.translate удаляет их за один проход на C, без regex
+_CONTROL_CHARS_TABLE: Final[dict[int, None]] = dict.fromkeys(
+    [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F]
+)
+_EXCESS_NEWLINES_RE: Final = re.compile(r"\n{3,}")
+
+
 def _normalize_text(text: str) -> str:
     """
     Нормализует текст перед сохранением в БД:
@@ -38,18 +53,14 @@ def _normalize_text(text: str) -> str:
     if not text:
         return ""
 
-    # Удаляем NUL-символы
-    text = text.replace("\x00", "")
-
-    # Удаляем прочие непечатаемые управляющие символы (кроме \n, \r, \t)
-    control_chars_regex = r"[\u0000-\u0008\u000B\u000C\u000E-\u001F\u007F]"
-    text = re.sub(control_chars_regex, "", text)
+    # Удаляем NUL и прочие непечатаемые управляющие символы (кроме \n, \r, \t)
+    text = text.translate(_CONTROL_CHARS_TABLE)
 
     # Нормализуем переводы строк (CRLF -> LF)
     text = text.replace("\r\n", "\n").replace("\r", "\n")
 
     # Сжимаем более трёх переводов строки подряд до двух
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _EXCESS_NEWLINES_RE.sub("\n\n", text)
 
     # Удаляем лишние пробелы в начале и в конце строк
     lines = [line.strip() for line in text.split("\n")]
@@ -58,12 +69,154 @@ def _normalize_text(text: str) -> str:
     return text
 
 
-def extract_text_from_docx(file_bytes: bytes, filename: str | None = None) -> str:
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = f"{_W_NS}body"
+_W_P = f"{_W_NS}p"
+_W_R = f"{_W_NS}r"
+_W_T = f"{_W_NS}t"
+_W_TAB = f"{_W_NS}tab"
+_W_BR = f"{_W_NS}br"
+_W_CR = f"{_W_NS}cr"
+_W_HYPERLINK = f"{_W_NS}hyperlink"
+_W_TYPE = f"{_W_NS}type"
+_W_TBL = f"{_W_NS}tbl"
+_W_TR = f"{_W_NS}tr"
+_W_TC = f"{_W_NS}tc"
+_W_TR_PR = f"{_W_NS}trPr"
+_W_TC_PR = f"{_W_NS}tcPr"
+_W_GRID_BEFORE = f"{_W_NS}gridBefore"
+_W_GRID_SPAN = f"{_W_NS}gridSpan"
+_W_VMERGE = f"{_W_NS}vMerge"
+_W_VAL = f"{_W_NS}val"
+
+
+# Текст элементов внутри <w:r>, как str() соответствующих элементов python-docx
+_RUN_CHAR_TEXT: Final[dict[str, str]] = {
+    _W_TAB: "\t",
+    f"{_W_NS}ptab": "\t",
+    _W_CR: "\n",
+    f"{_W_NS}noBreakHyphen": "-",
+}
+
+
+def _docx_run_text(run: etree._Element) -> str:
+    parts: list[str] = []
+    for node in run.iterchildren():
+        if node.tag == _W_T:
+            parts.append(node.text or "")
+        elif node.tag == _W_BR:
+            # Разрыв страницы/колонки текста не даёт, только перенос строки
+            if node.get(_W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append(_RUN_CHAR_TEXT.get(node.tag, ""))
+    return "".join(parts)
+
+
+def _docx_paragraph_text(paragraph: etree._Element) -> str:
     """
-    Извлекает текст из DOCX файла с помощью python-docx.
+    Текст <w:p> так же, как paragraph.text в python-docx.
+
+    Учитываются только прямые <w:r> и <w:hyperlink>: текстовые поля
+    (w:txbxContent внутри рисунков) и прочие вложенные блоки пропускаются.
     """
-    logger.info("Extracting text from DOCX file", extra={"filename": filename})
+    parts: list[str] = []
+    for child in paragraph.iterchildren(_W_R, _W_HYPERLINK):
+        if child.tag == _W_R:
+            parts.append(_docx_run_text(child))
+        else:
+            parts.extend(_docx_run_text(run) for run in child.iterchildren(_W_R))
+    return "".join(parts)
+
 
+def _docx_int_val(parent: etree._Element | None, tag: str) -> int:
+    node = parent.find(tag) if parent is not None else None
+    return int(node.get(_W_VAL, 0)) if node is not None else 0
+
+
+def _docx_table_rows(table: etree._Element) -> list[str]:
+    """
+    Строки таблицы так же, как row.cells в python-docx.
+
+    Ячейка, объединённая по горизонтали (gridSpan), повторяется для каждой
+    колонки сетки; продолжение вертикального объединения (vMerge без
+    restart) берёт текст верхней ячейки из предыдущей строки.
+    """
+    rows: list[str] = []
+    # Смещение в сетке колонок -> (текст, сколько раз повторить) для
+    # ячеек предыдущей строки, уже с разрешённым vMerge
+    cells_above: dict[int, tuple[str, int]] = {}
+    for row in table.iterchildren(_W_TR):
+        row_cells: dict[int, tuple[str, int]] = {}
+        grid_offset = _docx_int_val(row.find(_W_TR_PR), _W_GRID_BEFORE)
+        cells_text: list[str] = []
+        for cell in row.iterchildren(_W_TC):
+            properties = cell.find(_W_TC_PR)
+            grid_span = _docx_int_val(properties, _W_GRID_SPAN) or 1
+            v_merge = properties.find(_W_VMERGE) if properties is not None else None
+
+            if (
+                v_merge is not None
+                and v_merge.get(_W_VAL, "continue") == "continue"
+                and grid_offset in cells_above
+            ):
+                resolved = cells_above[grid_offset]
+            else:
+                cell_text = "\n".join(
+                    _docx_paragraph_text(p) for p in cell.iterchildren(_W_P)
+                ).strip()
+                resolved = (cell_text, grid_span)
+
+            row_cells[grid_offset] = resolved
+            grid_offset += grid_span
+            text, repeat = resolved
+            if text:
+                cells_text.extend([text] * repeat)
+
+        cells_above = row_cells
+        if cells_text:
+            rows.append(" | ".join(cells_text))
+    return rows
+
+
+def _read_docx_blocks(file_bytes: bytes) -> tuple[list[str], list[str]]:
+    """
+    Абзацы и строки таблиц из word/document.xml потоковым разбором.
+
+    Дерево документа целиком в памяти не строится: каждый абзац/таблица
+    верхнего уровня очищается сразу после обработки.
+    """
+    paragraphs: list[str] = []
+    table_rows: list[str] = []
+
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+        with archive.open("word/document.xml") as document_xml:
+            for _, elem in etree.iterparse(
+                document_xml,
+                events=("end",),
+                tag=(_W_P, _W_TBL),
+                resolve_entities=False,
+            ):
+                body = elem.getparent()
+                # Абзацы внутри таблиц обрабатываются вместе с таблицей
+                if body is None or body.tag != _W_BODY:
+                    continue
+
+                if elem.tag == _W_P:
+                    text = _docx_paragraph_text(elem).strip()
+                    if text:
+                        paragraphs.append(text)
+                else:
+                    table_rows.extend(_docx_table_rows(elem))
+
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del body[0]
+
+    return paragraphs, table_rows
+
+
+def _read_docx_blocks_python_docx(file_bytes: bytes) -> tuple[list[str], list[str]]:
     with io.BytesIO(file_bytes) as buffer:
         document = Document(buffer)
 
@@ -76,13 +229,33 @@ def extract_text_from_docx(file_bytes: bytes, filename: str | None = None) -> st
             paragraphs.append(text)
 
     # Таблицы (если в документе есть важный текст в таблицах)
+    table_rows: list[str] = []
     for table in document.tables:
         for row in table.rows:
             cells_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
             if cells_text:
-                paragraphs.append(" | ".join(cells_text))
+                table_rows.append(" | ".join(cells_text))
+
+    return paragraphs, table_rows
+
+
+def extract_text_from_docx(file_bytes: bytes, filename: str | None = None) -> str:
+    """
+    Извлекает текст из DOCX файла: абзацы, затем строки таблиц.
+    """
+    logger.info("Extracting text from DOCX file", extra={"filename": filename})
+
+    try:
+        paragraphs, table_rows = _read_docx_blocks(file_bytes)
+    except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as exc:
+        logger.warning(
+            "Streaming DOCX parse failed, falling back to python-docx",
+            # "filename" — зарезервированный атрибут LogRecord
+            extra={"file_name": filename, "error": str(exc)},
+        )
+        paragraphs, table_rows = _read_docx_blocks_python_docx(file_bytes)
 
-    raw_text = "\n".join(paragraphs)
+    raw_text = "\n".join(paragraphs + table_rows)
     normalized = _normalize_text(raw_text)
 
     logger.info(
@@ -97,32 +270,124 @@ def extract_text_from_docx(file_bytes: bytes, filename: str | None = None) -> st
     return normalized
 
 
+# PDF короче этого разбирается в текущем процессе: запуск задач в пуле
+# дороже выигрыша
+PDF_PARALLEL_MIN_PAGES: Final[int] = 8
+
+# extract_text у pypdf — чистый Python под GIL, поэтому страницы большого
+# PDF разбираются в пуле процессов (по процессу на ядро). forkserver, а не
+# fork: индексация вызывается из потоков, fork многопоточного процесса
+# небезопасен
+_pdf_executor: ProcessPoolExecutor | None = None
+_pdf_executor_lock = threading.Lock()
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_executor
+    if _pdf_executor is None:
+        with _pdf_executor_lock:
+            if _pdf_executor is None:
+                _pdf_executor = ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+    return _pdf_executor
+
+
+def _discard_pdf_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Убирает сломанный пул (упал процесс-воркер); следующий PDF создаст новый.
+
+    shutdown освобождает оставшиеся процессы и служебные потоки пула —
+    без него они утекают вместе с потерянной ссылкой.
+    """
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is executor:
+            _pdf_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_pdf_pages(
+    reader: PdfReader, start: int, stop: int
+) -> list[tuple[int, str, str | None]]:
+    """(номер страницы, текст, ошибка) для страниц [start, stop)."""
+    pages: list[tuple[int, str, str | None]] = []
+    for page_index in range(start, stop):
+        try:
+            page_text = reader.pages[page_index].extract_text() or ""
+            pages.append((page_index, page_text, None))
+        except Exception as exc:
+            pages.append((page_index, "", str(exc)))
+    return pages
+
+
+def _extract_pdf_page_range(
+    file_bytes: bytes, start: int, stop: int
+) -> list[tuple[int, str, str | None]]:
+    """Задача пула: каждый процесс открывает PDF сам и разбирает свой диапазон."""
+    with io.BytesIO(file_bytes) as buffer:
+        return _extract_pdf_pages(PdfReader(buffer), start, stop)
+
+
+def _extract_pdf_pages_parallel(
+    file_bytes: bytes, page_count: int
+) -> list[tuple[int, str, str | None]]:
+    # Непрерывные диапазоны, а не по странице на задачу: каждый процесс
+    # заново разбирает структуру PDF, это делается один раз на диапазон
+    executor = _get_pdf_executor()
+    workers = min(os.cpu_count() or 1, page_count)
+    bounds = [page_count * i // workers for i in range(workers + 1)]
+    try:
+        futures = [
+            executor.submit(_extract_pdf_page_range, file_bytes, start, stop)
+            for start, stop in zip(bounds, bounds[1:])
+        ]
+        return [page for future in futures for page in future.result()]
+    except BrokenProcessPool:
+        _discard_pdf_executor(executor)
+        raise
+
+
 def extract_text_from_pdf(file_bytes: bytes, filename: str | None = None) -> str:
     """
     Извлекает текст из PDF с помощью pypdf.
+
+    Страницы большого PDF разбираются параллельно в пуле процессов.
     """
     logger.info("Extracting text from PDF file", extra={"filename": filename})
 
     with io.BytesIO(file_bytes) as buffer:
         reader = PdfReader(buffer)
+        page_count = len(reader.pages)
 
-        pages_text: list[str] = []
-        for page_index, page in enumerate(reader.pages):
+        pages: list[tuple[int, str, str | None]] | None = None
+        if page_count >= PDF_PARALLEL_MIN_PAGES and (os.cpu_count() or 1) > 1:
             try:
-                page_text = page.extract_text() or ""
-            except Exception as exc:
+                pages = _extract_pdf_pages_parallel(file_bytes, page_count)
+            except BrokenProcessPool as exc:
                 logger.warning(
-                    "Failed to extract text from PDF page",
-                    extra={
-                        "filename": filename,
-                        "page_index": page_index,
-                        "error": str(exc),
-                    },
+                    "PDF process pool is broken, extracting pages in-process",
+                    extra={"file_name": filename, "error": str(exc)},
                 )
-                page_text = ""
-            page_text = page_text.strip()
-            if page_text:
-                pages_text.append(page_text)
+        if pages is None:
+            pages = _extract_pdf_pages(reader, 0, page_count)
+
+    pages_text: list[str] = []
+    for page_index, page_text, error in pages:
+        if error is not None:
+            logger.warning(
+                "Failed to extract text from PDF page",
+                extra={
+                    # "filename" — зарезервированный атрибут LogRecord
+                    "file_name": filename,
+                    "page_index": page_index,
+                    "error": error,
+                },
+            )
+        page_text = page_text.strip()
+        if page_text:
+            pages_text.append(page_text)
 
     raw_text = "\n\n".join(pages_text)
     normalized = _normalize_text(raw_text)
@@ -131,7 +396,7 @@ def extract_text_from_pdf(file_bytes: bytes, filename: str | None = None) -> str
         "PDF text extracted",
         extra={
             "filename": filename,
-            "pages": len(reader.pages),
+            "pages": page_count,
             "chars_raw": len(raw_text),
             "chars_normalized": len(normalized),
         },
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, List
+
+import requests
+from urllib3.util.retry import Retry
+
+from app.core.http import create_session
+from app.core.logging import get_logger
+from app.core.rate_limit import TokenBucket
+from app.modules.files.service import EmbeddingProvider
+
+if TYPE_CHECKING:
+    from app.core.config import RuntimeSettings
+
+logger = get_logger(__name__)
+
+GEMINI_API_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+
+def _create_session() -> requests.Session:
+    # Повторы на 429/5xx с экспоненциальной паузой; POST батча идемпотентен
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        # Когда повторы кончились, вернуть последний ответ, а не RetryError:
+        # на 429 _post_batch притормаживает rate limiter, raise_for_status
+        # поднимет HTTPError
+        raise_on_status=False,
+    )
+    return create_session(pool_maxsize=32, max_retries=retry)
+
+
+# Одна сессия (keep-alive пул TLS-соединений) на процесс: провайдер создаётся
+# на каждый запрос, соединения — нет
+_session = _create_session()
+
+
+# Потоки для запросов с хеджированием. Проигравший запрос отменить нельзя
+# (requests не прерывается) — он дорабатывает здесь в фоне
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gemini-hedge")
+
+
+@lru_cache
+def _get_rate_limiter(requests_per_minute: int) -> TokenBucket:
+    # Один bucket на процесс: квота общая для всех провайдеров и потоков.
+    # Запас — секунда запросов, чтобы батчи документа уходили сразу
+    rate = requests_per_minute / 60
+    return TokenBucket(rate=rate, capacity=max(1.0, rate))
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """
+    Эмбеддинги через Gemini batchEmbedContents.
+
+    Любое число текстов уходит батчами по batch_size — один HTTP-запрос на
+    батч, а не на текст. Размерность задаётся outputDimensionality и
+    совпадает с размерностью коллекции Qdrant.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        vector_size: int,
+        model: str = "gemini-embedding-001",
+        batch_size: int = 100,
+        concurrency: int = 4,
+        timeout: float = 30.0,
+        session: requests.Session | None = None,
+        rate_limiter: TokenBucket | None = None,
+        hedge_after: float | None = None,
+    ):
+        super().__init__(vector_size)
+        self._session = session or _session
+        self._api_key = api_key
+        self.model = model
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._timeout = timeout
+        self._rate_limiter = rate_limiter
+        self._hedge_after = hedge_after
+        self._url = f"{GEMINI_API_BASE_URL}/models/{model}:batchEmbedContents"
+
+    def embed(self, text: str) -> List[float]:
+        # Одиночный текст — поисковый запрос: пользователь ждёт ответа,
+        # поэтому зависший запрос дублируется
+        if not self._hedge_after:
+            return self._post_batch([text], "RETRIEVAL_QUERY")[0]
+        return self._hedged(lambda: self._post_batch([text], "RETRIEVAL_QUERY"))[0]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Эмбеддинги для списка текстов (чанков документа), в том же порядке.
+        """
+        return self._embed(texts, task_type="RETRIEVAL_DOCUMENT")
+
+    def _embed(self, texts: List[str], task_type: str) -> List[List[float]]:
+        # Одинаковые чанки (колонтитулы, шаблонные абзацы) запрашиваются
+        # один раз: вектор раздаётся по всем позициям исходного списка
+        positions: dict[str, int] = {}
+        unique_texts: List[str] = []
+        for text in texts:
+            if text not in positions:
+                positions[text] = len(unique_texts)
+                unique_texts.append(text)
+
+        vectors = self._embed_unique(unique_texts, task_type)
+        if len(unique_texts) == len(texts):
+            return vectors
+        return [vectors[positions[text]] for text in texts]
+
+    def _embed_unique(self, texts: List[str], task_type: str) -> List[List[float]]:
+        batches = [
+            texts[start : start + self._batch_size]
+            for start in range(0, len(texts), self._batch_size)
+        ]
+        if len(batches) <= 1 or self._concurrency <= 1:
+            return [
+                vector
+                for batch in batches
+                for vector in self._post_batch(batch, task_type)
+            ]
+
+        # Вызывающий код синхронный (поток воркера/threadpool FastAPI), поэтому
+        # запросы батчей перекрываются потоками; map сохраняет порядок
+        with ThreadPoolExecutor(
+            max_workers=min(self._concurrency, len(batches)),
+            thread_name_prefix="gemini-embed",
+        ) as executor:
+            results = executor.map(
+                lambda batch: self._post_batch(batch, task_type), batches
+            )
+            return [vector for batch_vectors in results for vector in batch_vectors]
+
+    def _hedged(self, call: Callable[[], List[List[float]]]) -> List[List[float]]:
+        """
+        Hedged request: если call не ответил за hedge_after секунд, тот же
+        запрос (он идемпотентен) отправляется ещё раз; возвращается первый
+        успешный ответ. Ошибка — только если упали оба.
+        """
+        primary = _hedge_executor.submit(call)
+        done, _ = wait([primary], timeout=self._hedge_after)
+        if done:
+            return primary.result()
+
+        logger.info(
+            "Gemini embedding request is slow, sending a hedged request",
+            extra={"model": self.model, "hedge_after": self._hedge_after},
+        )
+        hedge = _hedge_executor.submit(call)
+        for future in as_completed((primary, hedge)):
+            if future.exception() is None:
+                return future.result()
+        # Упали оба — пробрасываем ошибку основного запроса
+        return primary.result()
+
+    def _post_batch(self, texts: List[str], task_type: str) -> List[List[float]]:
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{self.model}",
+                    "content": {"parts": [{"text": text}]},
+                    "taskType": task_type,
+                    "outputDimensionality": self.vector_size,
+                }
+                for text in texts
+            ]
+        }
+        logger.info(
+            "Requesting Gemini embeddings",
+            extra={"model": self.model, "texts": len(texts)},
+        )
+        if self._rate_limiter is not None:
+            self._rate_limiter.wait()
+        response = self._session.post(
+            self._url,
+            params={"key": self._api_key},
+            json=payload,
+            timeout=self._timeout,
+        )
+        if response.status_code == 429 and self._rate_limiter is not None:
+            # Повторы адаптера исчерпаны — притормаживаем остальные запросы
+            self._rate_limiter.penalize(1.0)
+        response.raise_for_status()
+
+        embeddings = response.json().get("embeddings", [])
+        if len(embeddings) != len(texts):
+            raise ValueError(
+                f"Gemini returned {len(embeddings)} embeddings for {len(texts)} texts"
+            )
+        return [embedding["values"] for embedding in embeddings]
+
+
+def create_embedding_provider(settings: RuntimeSettings) -> EmbeddingProvider:
+    """Провайдер эмбеддингов по настройке EMBEDDING_PROVIDER."""
+    if settings.EMBEDDING_PROVIDER == "gemini":
+        if not settings.GEMINI_API_KEY:
+            raise RuntimeError(
+                "GEMINI_API_KEY is required for EMBEDDING_PROVIDER=gemini"
+            )
+        return GeminiEmbeddingProvider(
+            api_key=settings.GEMINI_API_KEY,
+            vector_size=settings.QDRANT_VECTOR_SIZE,
+            model=settings.GEMINI_EMBEDDING_MODEL,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            concurrency=settings.EMBEDDING_CONCURRENCY,
+            rate_limiter=_get_rate_limiter(settings.EMBEDDING_REQUESTS_PER_MINUTE),
+            hedge_after=settings.EMBEDDING_HEDGE_AFTER_SECONDS,
+        )
+    return EmbeddingProvider(vector_size=settings.QDRANT_VECTOR_SIZE)
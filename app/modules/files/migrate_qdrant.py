@@ -0,0 +1,37 @@
+"""One-off Qdrant collection migration.
+
+Run once per deployment (``python -m app.modules.files.migrate_qdrant``) to
+bring a collection created before int8 quantization up to the current
+config. New collections are created with it already; API and worker
+processes never change an existing collection themselves.
+"""
+
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.modules.files.qdrant_client import QdrantVectorStore
+
+logger = get_logger(__name__)
+
+
+def migrate_qdrant() -> None:
+    """Enable int8 quantization (vectors on disk) for the files collection."""
+    store = QdrantVectorStore(
+        url=settings.QDRANT_URL,
+        collection_name=settings.QDRANT_COLLECTION_NAME,
+        vector_size=settings.QDRANT_VECTOR_SIZE,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+    )
+    changed = store.enable_quantization()
+
+    logger.info(
+        "Qdrant collection is up to date",
+        extra={
+            "collection_name": settings.QDRANT_COLLECTION_NAME,
+            "quantization_enabled": changed,
+        },
+    )
+
+
+if __name__ == "__main__":
+    configure_logging()
+    migrate_qdrant()
@@ -13,6 +13,7 @@ from sqlalchemy import (
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from uuid_extensions import uuid7
 
 from app.core.db import Base
 
@@ -33,7 +34,7 @@ class StoredFile(Base):
     __tablename__ = "stored_files"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
 
     owner_id: Mapped[uuid.UUID] = mapped_column(
@@ -80,7 +81,7 @@ class FileChunk(Base):
     __tablename__ = "file_chunks"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     file_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
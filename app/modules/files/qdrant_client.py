@@ -1,22 +1,77 @@
 from __future__ import annotations
 
+import threading
 from typing import Any, List
 
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
+    Datatype,
     Distance,
     FieldCondition,
     Filter,
+    FilterSelector,
+    HnswConfigDiff,
     MatchValue,
+    PayloadSchemaType,
     PointStruct,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
     ScoredPoint,
+    SearchParams,
+    UpdateStatus,
     VectorParams,
+    VectorParamsDiff,
 )
 
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Поля payload, по которым фильтруются поиск (build_filter) и удаление:
+# с индексом Qdrant фильтрует во время обхода HNSW, а не после
+INDEXED_PAYLOAD_FIELDS = ("file_id", "scope", "customer_id", "owner_id")
+
+# int8 scalar quantization: поиск идёт по int8-копиям векторов в RAM, кандидаты
+# (limit * oversampling) пересчитываются по исходным векторам с диска (FLOAT16
+# в новых коллекциях). Существующим коллекциям квантование включает только
+# разовая миграция app.modules.files.migrate_qdrant
+_QUANTIZATION_CONFIG = ScalarQuantization(
+    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+)
+
+# hnsw_ef задан явно, а не «как ef_construct»: он должен покрывать
+# limit * oversampling (до 50 * 2 в /files/admin/search)
+_SEARCH_PARAMS = SearchParams(
+    hnsw_ef=128,
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0),
+)
+
+
+# Один QdrantClient (со своим пулом соединений) на адрес в процессе:
+# хранилище создаётся на каждый запрос, клиент — нет
+_clients: dict[tuple[str, bool], QdrantClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(url: str, prefer_grpc: bool) -> QdrantClient:
+    key = (url, prefer_grpc)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = QdrantClient(url=url, prefer_grpc=prefer_grpc, timeout=10)
+                _clients[key] = client
+    return client
+
+
+# Размерность векторов по (url, коллекция): проверка/создание коллекции и
+# get_collection выполняются один раз на процесс, а не на каждое хранилище
+_collection_vector_sizes: dict[tuple[str, str], int] = {}
+_collections_lock = threading.Lock()
+
 
 class QdrantVectorStore:
     """
@@ -27,28 +82,68 @@ class QdrantVectorStore:
     - Даёт удобный метод поиска с Filter.
     """
 
-    def __init__(self, url: str, collection_name: str, vector_size: int):
+    def __init__(
+        self,
+        url: str,
+        collection_name: str,
+        vector_size: int,
+        prefer_grpc: bool = False,
+    ):
         # Используем Any, т.к. type-stubs qdrant-client неполные и basedpyright
         # не знает о методах search/upsert/...
-        self._client: Any = QdrantClient(url=url)
+        self._client: Any = _get_client(url, prefer_grpc)
         self._collection_name = collection_name
         self._vector_size = vector_size
+        # client.search удалён в новых qdrant-client (остался query_points):
+        # реализация выбирается один раз, а не проверяется на каждом поиске
+        self._search = (
+            self._client.search
+            if hasattr(self._client, "search")
+            else self._query_points
+        )
 
-        self._ensure_collection()
+        key = (url, collection_name)
+        if key not in _collection_vector_sizes:
+            with _collections_lock:
+                if key not in _collection_vector_sizes:
+                    _collection_vector_sizes[key] = self._ensure_collection()
+        self._vector_size = _collection_vector_sizes[key]
 
-    def _ensure_collection(self) -> None:
+    def _ensure_collection(self) -> int:
         """
-        Создаёт коллекцию, если её ещё нет.
-        """
-        collections = self._client.get_collections()
-        exists = any(c.name == self._collection_name for c in collections.collections)
+        Создаёт коллекцию, если её ещё нет, и индексы по полям payload.
 
-        if exists:
+        Возвращает фактическую размерность векторов коллекции.
+        """
+        if self._client.collection_exists(self._collection_name):
             logger.info(
                 "Qdrant collection already exists",
                 extra={"collection_name": self._collection_name},
             )
-            return
+            info = self._client.get_collection(self._collection_name)
+            self._ensure_payload_indexes(set(info.payload_schema or {}))
+            if info.config.quantization_config is None:
+                # Перестройка коллекции под живым трафиком — не дело пути
+                # чтения: квантование включается отдельной командой
+                logger.warning(
+                    "Qdrant collection has no quantization, run "
+                    "python -m app.modules.files.migrate_qdrant",
+                    extra={"collection_name": self._collection_name},
+                )
+
+            vectors = info.config.params.vectors
+            if isinstance(vectors, VectorParams):
+                if vectors.size != self._vector_size:
+                    logger.warning(
+                        "Qdrant collection vector size differs from settings",
+                        extra={
+                            "collection_name": self._collection_name,
+                            "collection_vector_size": vectors.size,
+                            "configured_vector_size": self._vector_size,
+                        },
+                    )
+                return vectors.size
+            return self._vector_size
 
         logger.info(
             "Creating Qdrant collection",
@@ -58,13 +153,69 @@ class QdrantVectorStore:
             },
         )
 
-        self._client.recreate_collection(
+        self._client.create_collection(
             collection_name=self._collection_name,
             vectors_config=VectorParams(
                 size=self._vector_size,
                 distance=Distance.COSINE,
+                # Исходные вектора нужны только для rescore после int8-поиска:
+                # float16 вдвое меньше float32 при той же точности ранжирования
+                datatype=Datatype.FLOAT16,
+                # ...поэтому лежат на диске, в RAM только int8-копия
+                on_disk=True,
+            ),
+            quantization_config=_QUANTIZATION_CONFIG,
+            # Меньше full_scan_threshold (КБ векторов) сегмент ищется полным
+            # перебором — на маленьких сегментах это быстрее обхода графа
+            hnsw_config=HnswConfigDiff(
+                m=16, ef_construct=128, full_scan_threshold=10000
             ),
+            # Текст чанков лежит в Postgres, payload маленький — держим на диске
+            on_disk_payload=True,
         )
+        self._ensure_payload_indexes(set())
+        return self._vector_size
+
+    def enable_quantization(self) -> bool:
+        """
+        Включает int8-квантование в коллекции, созданной без него.
+
+        Квантованные вектора Qdrant строит в фоне, исходные переезжают на диск.
+        Разовая миграция (app.modules.files.migrate_qdrant), не для пути
+        запросов. Возвращает False, если квантование уже включено.
+        """
+        info = self._client.get_collection(self._collection_name)
+        if info.config.quantization_config is not None:
+            return False
+
+        logger.info(
+            "Enabling int8 quantization for Qdrant collection",
+            extra={"collection_name": self._collection_name},
+        )
+        self._client.update_collection(
+            collection_name=self._collection_name,
+            quantization_config=_QUANTIZATION_CONFIG,
+            vectors_config={"": VectorParamsDiff(on_disk=True)},
+        )
+        return True
+
+    def _ensure_payload_indexes(self, existing: set[str]) -> None:
+        for field_name in INDEXED_PAYLOAD_FIELDS:
+            if field_name in existing:
+                continue
+
+            logger.info(
+                "Creating Qdrant payload index",
+                extra={
+                    "collection_name": self._collection_name,
+                    "field_name": field_name,
+                },
+            )
+            self._client.create_payload_index(
+                collection_name=self._collection_name,
+                field_name=field_name,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
 
     def upsert_vectors(self, points: List[PointStruct]) -> None:
         """
@@ -86,6 +237,30 @@ class QdrantVectorStore:
             points=points,
         )
 
+    def delete_file_vectors(self, file_id: str) -> UpdateStatus:
+        """
+        Удаляет все поинты файла фильтром по payload на стороне Qdrant.
+
+        wait=True: к возврату старые вектора уже не участвуют в поиске.
+        """
+        logger.info(
+            "Deleting file vectors from Qdrant",
+            extra={"collection_name": self._collection_name, "file_id": file_id},
+        )
+
+        result = self._client.delete(
+            collection_name=self._collection_name,
+            points_selector=FilterSelector(
+                filter=Filter(
+                    must=[
+                        FieldCondition(key="file_id", match=MatchValue(value=file_id))
+                    ]
+                )
+            ),
+            wait=True,
+        )
+        return result.status
+
     def search(
         self,
         query_vector: List[float],
@@ -104,14 +279,33 @@ class QdrantVectorStore:
             },
         )
 
-        results: List[ScoredPoint] = self._client.search(
+        results: List[ScoredPoint] = self._search(
             collection_name=self._collection_name,
             query_vector=query_vector,
             limit=limit,
             query_filter=filter_,
+            search_params=_SEARCH_PARAMS,
         )
         return results
 
+    def _query_points(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int,
+        query_filter: Filter | None,
+        search_params: SearchParams,
+    ) -> List[ScoredPoint]:
+        """search() поверх query_points для qdrant-client без метода search."""
+        response = self._client.query_points(
+            collection_name=collection_name,
+            query=query_vector,
+            limit=limit,
+            query_filter=query_filter,
+            search_params=search_params,
+        )
+        return response.points
+
     @staticmethod
     def build_filter(
         scope: str | None = None,
@@ -2,19 +2,21 @@ import io
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.config import settings
+from app.core.config import RuntimeSettings, get_settings
 from app.core.db import get_db
 from app.core.helpers.helpers import get_arq_redis
 from app.core.logging import get_logger
-from app.modules.auth.models import User
+from app.modules.auth.models import UserSnapshot
 from app.modules.auth.router import (
     get_current_admin,
     get_current_employee,
     get_current_user,
 )
+from app.modules.files.gemini_embeddings import create_embedding_provider
 from app.modules.files.models import FileScope
 from app.modules.files.qdrant_client import QdrantVectorStore
 from app.modules.files.schemas import (
@@ -22,7 +24,7 @@ from app.modules.files.schemas import (
     FileListResponse,
     FileUploadResponse,
 )
-from app.modules.files.service import EmbeddingProvider, FileService
+from app.modules.files.service import FileService
 from app.modules.files.storage import FileStorage, S3Config
 
 logger = get_logger(__name__)
@@ -31,25 +33,20 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/files", tags=["files"])
 
 
-def _get_file_service(db: Session = Depends(get_db)) -> FileService:
-    storage = FileStorage(
-        S3Config(
-            endpoint_url=settings.S3_ENDPOINT_URL,
-            access_key=settings.S3_ACCESS_KEY,
-            secret_key=settings.S3_SECRET_KEY,
-            region=settings.S3_REGION,
-            bucket_admin_laws=settings.S3_BUCKET_ADMIN_LAWS,
-            bucket_customer_docs=settings.S3_BUCKET_CUSTOMER_DOCS,
-        )
-    )
+def _get_file_service(
+    db: Session = Depends(get_db),
+    settings: RuntimeSettings = Depends(get_settings),
+) -> FileService:
+    storage = FileStorage(S3Config.from_settings(settings))
 
     vector_store = QdrantVectorStore(
         url=settings.QDRANT_URL,
         collection_name=settings.QDRANT_COLLECTION_NAME,
         vector_size=settings.QDRANT_VECTOR_SIZE,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
     )
 
-    embedding_provider = EmbeddingProvider(vector_size=settings.QDRANT_VECTOR_SIZE)
+    embedding_provider = create_embedding_provider(settings)
 
     return FileService(
         db=db,
@@ -62,12 +59,11 @@ def _get_file_service(db: Session = Depends(get_db)) -> FileService:
 @router.post("/admin", status_code=201)
 async def upload_admin_file(
     file: UploadFile = File(...),
-    user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    user: UserSnapshot = Depends(get_current_admin),
+    service: FileService = Depends(_get_file_service),
 ):
-    service = _get_file_service(db)
-
-    stored_file = service.upload_admin_file(user, file)
+    # Загрузка в S3 и запись в БД синхронные — не блокируем event loop
+    stored_file = await run_in_threadpool(service.upload_admin_file, user, file)
 
     # Ставим задачу в Arq асинхронно
 
@@ -89,13 +85,27 @@ async def upload_admin_file(
     status_code=status.HTTP_201_CREATED,
     summary="Загрузка файла заказчика",
 )
-def upload_customer_file(
+async def upload_customer_file(
     customer_id: str,
     file: UploadFile = File(...),
-    user: User = Depends(get_current_employee),
+    user: UserSnapshot = Depends(get_current_employee),
     service: FileService = Depends(_get_file_service),
 ):
-    return service.upload_customer_file(user=user, customer_id=customer_id, file=file)
+    stored_file = await run_in_threadpool(
+        service.upload_customer_file, user=user, customer_id=customer_id, file=file
+    )
+
+    # Файл сохранён со статусом QUEUED — индексацию выполняет воркер Arq,
+    # ответ не ждёт эмбеддингов
+    redis = await get_arq_redis()
+    await redis.enqueue_job("index_file_task", str(stored_file.id))
+
+    logger.info(
+        "Index file task enqueued",
+        extra={"stored_file_id": str(stored_file.id)},
+    )
+
+    return stored_file
 
 
 @router.get(
@@ -109,7 +119,7 @@ def list_admin_files(
     service: FileService = Depends(_get_file_service),
 ):
     files = service.list_admin_files(search=search)
-    # Pydantic сам сконвертирует StoredFile -> FileInfo (через orm_mode)
+    # Pydantic сам сконвертирует StoredFile -> FileInfo (через from_attributes)
     return {"items": files, "total": len(files)}
 
 
@@ -182,7 +192,7 @@ def download_file(
 def search_admin_files(
     query: str = Query(..., description="Поисковый запрос"),
     limit: int = Query(5, ge=1, le=50),
-    user: User = Depends(get_current_admin),
+    user: UserSnapshot = Depends(get_current_admin),
     service: FileService = Depends(_get_file_service),
 ):
     """
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class FileScope(str, Enum):
@@ -10,6 +10,8 @@ class FileScope(str, Enum):
 
 
 class FileUploadResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     scope: FileScope
     customer_id: Optional[str] = None
@@ -18,9 +20,6 @@ class FileUploadResponse(BaseModel):
     original_filename: str
     is_indexed: bool
 
-    class Config:
-        orm_mode = True
-
 
 class FileInfo(FileUploadResponse):
     content_type: Optional[str] = None
@@ -47,4 +46,3 @@ class ChunkSearchResponse(BaseModel):
     items: list[ChunkSearchResult]
 
     total: int
-
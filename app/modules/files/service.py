@@ -1,24 +1,70 @@
 from __future__ import annotations
 
+import hashlib
 import io
 import uuid
-from typing import List, cast
+from array import array
+from datetime import datetime
+from typing import Any, List, cast
 
 from qdrant_client.models import Filter, PointStruct, ScoredPoint
+from sqlalchemy import delete, select, tuple_
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.modules.files.file_text_extractor import extract_text
 from app.modules.files.models import FileChunk, FileScope, StoredFile
 from app.modules.files.qdrant_client import QdrantVectorStore
+from app.modules.files.simhash import hamming_distance, simhash64, simhash_bands
 from app.modules.files.storage import FileStorage
 
 logger = get_logger(__name__)
 
+# Эмбеддинги поисковых запросов: повторный запрос (ретрай, тот же вопрос)
+# не идёт в провайдер. Ключ — провайдер, модель, размерность и 16-байтный
+# хеш запроса (длинные запросы не хранятся в ключах целиком).
+# Вектор хранится в int8 с масштабом (_quantize): 1 байт на компоненту вместо
+# ~32 байт на float в tuple
+_QuantizedVector = tuple[float, "array[int]"]
+_query_embeddings: TTLCache[tuple[str, str, int, bytes], _QuantizedVector] = (
+    TTLCache(maxsize=1024, ttl=3600)
+)
+
+# Индекс нечёткого кэша (EMBEDDING_FUZZY_CACHE): (провайдер, модель,
+# размерность, полоса SimHash) -> (отпечаток, ключ _query_embeddings).
+# Сами вектора лежат только в _query_embeddings; вытесненные оттуда записи
+# здесь просто дают промах
+_query_simhash_bands: TTLCache[
+    tuple[str, str, int, int, int], tuple[tuple[int, tuple[Any, ...]], ...]
+] = TTLCache(maxsize=4096, ttl=3600)
+
+# Сколько отпечатков хранится в одной полосе
+_SIMHASH_BAND_SIZE = 16
+
+
+def _quantize(vector: List[float]) -> _QuantizedVector:
+    """
+    Симметричное int8-квантование с масштабом на вектор.
+
+    Ошибка компоненты — не больше scale / 2; косинусная близость к исходному
+    вектору практически 1, на выдачу поиска это не влияет.
+    """
+    scale = max(map(abs, vector), default=0.0) / 127 or 1.0
+    return scale, array("b", [round(value / scale) for value in vector])
+
+
+def _dequantize(quantized: _QuantizedVector) -> List[float]:
+    scale, values = quantized
+    return [value * scale for value in values]
+
 
 class EmbeddingProvider:
     """Stub embedding provider. Replace with actual model integration."""
 
+    model = "stub"
+
     def __init__(self, vector_size: int):
         self.vector_size = vector_size
 
@@ -26,6 +72,15 @@ class EmbeddingProvider:
         base = float(len(text) % 13 + 1)
         return [((i + 1) * base) % 7 for i in range(self.vector_size)]
 
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Эмбеддинги для списка текстов, в том же порядке.
+
+        Реальные провайдеры принимают батч одним HTTP-запросом — индексация
+        файла должна вызывать этот метод, а не embed в цикле.
+        """
+        return [self.embed(text) for text in texts]
+
 
 def chunk_text(text: str, chunk_size: int = 1500) -> List[str]:
     """
@@ -229,6 +284,13 @@ class FileService:
                 self.db.commit()
                 return
 
+            # Повторная индексация (ретрай задачи, переиндексация):
+            # убираем старые вектора и чанки, иначе в поиске будут дубли
+            self.vector_store.delete_file_vectors(str(stored_file.id))
+            self.db.execute(
+                delete(FileChunk).where(FileChunk.file_id == stored_file.id)
+            )
+
             chunks = chunk_text(text)
             logger.info(
                 "Text chunked for indexing",
@@ -239,14 +301,28 @@ class FileService:
                 },
             )
 
+            # Все чанки файла — одним батчем в провайдер эмбеддингов
+            embeddings = self.embedding_provider.embed_batch(chunks)
+
             points: list[PointStruct] = []
+            # Одно время создания на весь батч вместо default=utcnow на строку
+            created_at = datetime.utcnow()
+            # Поля payload, общие для всех чанков файла, — строки один раз
+            file_payload = {
+                "file_id": str(stored_file.id),
+                "scope": stored_file.scope.value,
+                "customer_id": stored_file.customer_id,
+                "owner_id": str(stored_file.owner_id),
+            }
 
-            for idx, chunk_text_value in enumerate(chunks):
-                embedding = self.embedding_provider.embed(chunk_text_value)
+            for idx, (chunk_text_value, embedding) in enumerate(
+                zip(chunks, embeddings)
+            ):
                 chunk = FileChunk(
                     file_id=stored_file.id,
                     chunk_index=idx,
                     text=chunk_text_value,
+                    created_at=created_at,
                 )
                 self.db.add(chunk)
 
@@ -255,13 +331,7 @@ class FileService:
                     PointStruct(
                         id=point_id,
                         vector=embedding,
-                        payload={
-                            "file_id": str(stored_file.id),
-                            "chunk_index": idx,
-                            "scope": stored_file.scope.value,
-                            "customer_id": stored_file.customer_id,
-                            "owner_id": str(stored_file.owner_id),
-                        },
+                        payload={**file_payload, "chunk_index": idx},
                     )
                 )
                 chunk.qdrant_point_id = point_id
@@ -307,81 +377,142 @@ class FileService:
             stored_file.index_error = str(exc)
             self.db.commit()
 
-        def search_chunks(
-            self,
-            query: str,
-            limit: int = 5,
-            scope: FileScope | None = None,
-            customer_id: str | None = None,
-            owner_id: str | None = None,
-        ) -> list[dict[str, Any]]:
-            """
-            Выполнить семантический поиск по индексированным чанкам файлов.
-
-            - query: текст запроса
-            - limit: максимальное количество результатов
-            - scope: ADMIN_LAW / CUSTOMER_DOC (ограничить поиск по типу файла)
-            - customer_id: ограничить поиск по заказчику
-            - owner_id: ограничить поиск по владельцу (для сотрудников)
-            """
-            # 1. Эмбеддинг запроса
-            query_vector = self.embedding_provider.embed(query)
-
-            # 2. Фильтр по payload
-            q_filter: Filter | None = self.vector_store.build_filter(
-                scope=scope.value if scope else None,
-                customer_id=customer_id,
-                owner_id=str(owner_id) if owner_id is not None else None,
-            )
-
-            # 3. Поиск в Qdrant
-            points: list[ScoredPoint] = self.vector_store.search(
-                query_vector=query_vector,
-                limit=limit,
-                filter_=q_filter,
-            )
-
-            if not points:
-                return []
-
-            # 4. Подтягиваем чанки и файлы из БД
-            results: list[dict[str, Any]] = []
-
-            for point in points:
-                payload = point.payload or {}
-                file_id = payload.get("file_id")
-                chunk_index = payload.get("chunk_index")
+    def search_chunks(
+        self,
+        query: str,
+        limit: int = 5,
+        scope: FileScope | None = None,
+        customer_id: str | None = None,
+        owner_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Выполнить семантический поиск по индексированным чанкам файлов.
+
+        - query: текст запроса
+        - limit: максимальное количество результатов
+        - scope: ADMIN_LAW / CUSTOMER_DOC (ограничить поиск по типу файла)
+        - customer_id: ограничить поиск по заказчику
+        - owner_id: ограничить поиск по владельцу (для сотрудников)
+        """
+        # 1. Эмбеддинг запроса
+        query_vector = self._embed_query(query)
+
+        # 2. Фильтр по payload
+        q_filter: Filter | None = self.vector_store.build_filter(
+            scope=scope.value if scope else None,
+            customer_id=customer_id,
+            owner_id=str(owner_id) if owner_id is not None else None,
+        )
 
-                if not file_id:
-                    continue
+        # 3. Поиск в Qdrant
+        points: list[ScoredPoint] = self.vector_store.search(
+            query_vector=query_vector,
+            limit=limit,
+            filter_=q_filter,
+        )
 
-                chunk = (
-                    self.db.query(FileChunk)
-                    .filter(
-                        FileChunk.file_id == file_id,
-                        FileChunk.chunk_index == chunk_index,
-                    )
-                    .first()
-                )
-                if not chunk:
-                    continue
-
-                stored_file = self.db.query(StoredFile).get(file_id)
-
-                results.append(
-                    {
-                        "score": point.score,
-                        "file_id": file_id,
-                        "chunk_index": chunk_index,
-                        "text": chunk.text,
-                        "filename": stored_file.original_filename
-                        if stored_file
-                        else None,
-                        "scope": payload.get("scope"),
-                        "customer_id": payload.get("customer_id"),
-                        "owner_id": payload.get("owner_id"),
-                    }
+        if not points:
+            return []
+
+        # 4. Подтягиваем тексты чанков и имена файлов одним запросом
+        hits: list[tuple[ScoredPoint, tuple[uuid.UUID, int]]] = []
+        for point in points:
+            payload = point.payload or {}
+            try:
+                key = (uuid.UUID(payload["file_id"]), int(payload["chunk_index"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            hits.append((point, key))
+
+        if not hits:
+            return []
+
+        rows = self.db.execute(
+            select(
+                FileChunk.file_id,
+                FileChunk.chunk_index,
+                FileChunk.text,
+                StoredFile.original_filename,
+            )
+            .join(StoredFile, StoredFile.id == FileChunk.file_id)
+            .where(
+                tuple_(FileChunk.file_id, FileChunk.chunk_index).in_(
+                    [key for _, key in hits]
                 )
+            )
+        ).all()
+        found = {
+            (row.file_id, row.chunk_index): (row.text, row.original_filename)
+            for row in rows
+        }
+
+        # Порядок — как в выдаче Qdrant (по score)
+        results: list[dict[str, Any]] = []
+        for point, key in hits:
+            chunk = found.get(key)
+            if chunk is None:
+                continue
+
+            text, filename = chunk
+            payload = point.payload or {}
+            results.append(
+                {
+                    "score": point.score,
+                    "file_id": payload["file_id"],
+                    "chunk_index": key[1],
+                    "text": text,
+                    "filename": filename,
+                    "scope": payload.get("scope"),
+                    "customer_id": payload.get("customer_id"),
+                    "owner_id": payload.get("owner_id"),
+                }
+            )
 
-            return results
-
+        return results
+
+    def _embed_query(self, query: str) -> List[float]:
+        """Эмбеддинг запроса с кэшем; пробелы по краям и повторы схлопываются."""
+        normalized = " ".join(query.split())
+        provider = self.embedding_provider
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        key = (type(provider).__name__, provider.model, provider.vector_size, digest)
+
+        cached = _query_embeddings.get(key)
+        if cached is not None:
+            return _dequantize(cached)
+
+        if not settings.EMBEDDING_FUZZY_CACHE:
+            vector = provider.embed(normalized)
+            _query_embeddings.set(key, _quantize(vector))
+            return vector
+
+        fingerprint = simhash64(normalized)
+        bands = [key[:3] + band for band in simhash_bands(fingerprint)]
+        cached = self._find_similar_query(bands, fingerprint)
+        if cached is not None:
+            _query_embeddings.set(key, cached)
+            return _dequantize(cached)
+
+        vector = provider.embed(normalized)
+        for band_key in bands:
+            entries = _query_simhash_bands.get(band_key) or ()
+            entries = ((fingerprint, key),) + entries[: _SIMHASH_BAND_SIZE - 1]
+            _query_simhash_bands.set(band_key, entries)
+        _query_embeddings.set(key, _quantize(vector))
+        return vector
+
+    @staticmethod
+    def _find_similar_query(
+        bands: list[tuple[str, str, int, int, int]], fingerprint: int
+    ) -> _QuantizedVector | None:
+        """Вектор ранее виденного запроса с близким SimHash, если есть."""
+        for band_key in bands:
+            for other, other_key in _query_simhash_bands.get(band_key) or ():
+                if (
+                    hamming_distance(fingerprint, other)
+                    <= settings.EMBEDDING_FUZZY_MAX_DISTANCE
+                ):
+                    cached = _query_embeddings.get(other_key)
+                    if cached is not None:
+                        return cached
+        return None
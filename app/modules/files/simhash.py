@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Final
+
+SIMHASH_BITS: Final[int] = 64
+# 64 бита делятся на 4 полосы по 16: у отпечатков на расстоянии Хэмминга
+# не больше 3 хотя бы одна полоса совпадает целиком (принцип Дирихле)
+SIMHASH_BANDS: Final[int] = 4
+_BAND_BITS: Final[int] = SIMHASH_BITS // SIMHASH_BANDS
+_BAND_MASK: Final[int] = (1 << _BAND_BITS) - 1
+
+_PUNCTUATION_RE: Final = re.compile(r"[^\w\s]+")
+
+
+def simhash64(text: str, shingle_size: int = 3) -> int:
+    """
+    64-битный SimHash текста по символьным n-граммам.
+
+    Регистр, пунктуация и пробелы не учитываются (такие тексты получают
+    одинаковый отпечаток); у текстов с опечаткой отпечатки близки по
+    расстоянию Хэмминга.
+    """
+    text = " ".join(_PUNCTUATION_RE.sub(" ", text.lower()).split())
+    if len(text) <= shingle_size:
+        shingles = {text}
+    else:
+        shingles = {
+            text[i : i + shingle_size] for i in range(len(text) - shingle_size + 1)
+        }
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def simhash_bands(fingerprint: int) -> list[tuple[int, int]]:
+    """(номер полосы, значение полосы) — ключи индекса похожих отпечатков."""
+    return [
+        (band, fingerprint >> (band * _BAND_BITS) & _BAND_MASK)
+        for band in range(SIMHASH_BANDS)
+    ]
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return (left ^ right).bit_count()
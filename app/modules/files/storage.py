@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import BinaryIO
+from typing import TYPE_CHECKING, BinaryIO
 
 from minio import Minio
 from minio.error import S3Error
 
+if TYPE_CHECKING:
+    from app.core.config import RuntimeSettings
+
 
 @dataclass
 class S3Config:
@@ -16,6 +19,17 @@ class S3Config:
     bucket_admin_laws: str
     bucket_customer_docs: str
 
+    @classmethod
+    def from_settings(cls, settings: RuntimeSettings) -> S3Config:
+        return cls(
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION,
+            bucket_admin_laws=settings.S3_BUCKET_ADMIN_LAWS,
+            bucket_customer_docs=settings.S3_BUCKET_CUSTOMER_DOCS,
+        )
+
 
 class FileStorage:
     def __init__(self, cfg: S3Config):
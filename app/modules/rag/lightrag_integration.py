@@ -29,7 +29,6 @@ if not LIGHTRAG_AVAILABLE:
 
 from app.modules.rag.gemini import GeminiAPI
 from app.modules.files.qdrant_client import QdrantVectorStore
-from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
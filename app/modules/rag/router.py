@@ -1,5 +1,9 @@
 """RAG router with LIGHTRAG endpoints."""
+from functools import lru_cache
+
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
@@ -19,8 +23,12 @@ from app.modules.rag.gemini import GeminiAPI
 router = APIRouter(prefix="/rag", tags=["rag"])
 
 
+@lru_cache(maxsize=1)
 def _get_rag_service() -> RAGService:
-    """Создает экземпляр RAGService."""
+    """
+    RAGService на процесс: инициализация LIGHTRAG и клиента Gemini
+    выполняется при первом запросе, а не на каждом.
+    """
     gemini_api = GeminiAPI()
     return RAGService(gemini_api=gemini_api)
 
@@ -59,6 +67,40 @@ async def query_rag(
         )
 
 
+@router.post(
+    "/query/stream",
+    response_class=StreamingResponse,
+    summary="Потоковый запрос к RAG системе",
+    description="Тот же запрос, что /rag/query, но ответ приходит фрагментами (Server-Sent Events)",
+)
+async def query_rag_stream(
+    request: RAGQueryRequest,
+    service: RAGService = Depends(_get_rag_service),
+    _=Depends(get_current_user),
+):
+    """
+    Отдаёт ответ RAG событиями text/event-stream по мере генерации.
+    
+    События: data: {"text": "..."} для каждого фрагмента, затем event: done.
+    При ошибке в процессе — event: error с текстом ошибки.
+    """
+    def events():
+        # Синхронный генератор: Starlette итерирует его в threadpool
+        try:
+            for text in service.query_stream(
+                question=request.question,
+                mode=request.mode,
+                top_k=request.top_k,
+            ):
+                yield b"data: " + orjson.dumps({"text": text}) + b"\n\n"
+        except Exception as e:
+            yield b"event: error\ndata: " + orjson.dumps({"detail": str(e)}) + b"\n\n"
+            return
+        yield b"event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.post(
     "/insert",
     response_model=RAGInsertResponse,
@@ -1,10 +1,9 @@
 """RAG service with LIGHTRAG integration."""
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 from app.modules.rag.gemini import GeminiAPI
 from app.modules.rag.lightrag_integration import LightRAGService, create_lightrag_service
-from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +87,33 @@ class RAGService:
             logger.error(f"Error in RAG query: {e}")
             raise
     
+    def query_stream(
+        self,
+        question: str,
+        mode: str = "hybrid",
+        top_k: int = 5,
+    ) -> Iterator[str]:
+        """
+        Выполняет запрос к RAG системе, отдавая ответ фрагментами.
+        
+        Без LIGHTRAG фрагменты приходят из потокового API Gemini по мере
+        генерации; LIGHTRAG отвечает целиком, и ответ отдаётся одним фрагментом.
+        
+        Args:
+            question: Вопрос пользователя
+            mode: Режим запроса (naive, local, global, hybrid)
+            top_k: Количество результатов
+            
+        Yields:
+            Фрагменты текста ответа
+        """
+        if not self.lightrag:
+            logger.warning("LIGHTRAG not available, streaming direct Gemini query")
+            yield from self.gemini_api.generate_content_stream(question)
+            return
+        
+        yield self.query(question=question, mode=mode, top_k=top_k)["answer"]
+    
     def insert_text(
         self,
         text: str,
@@ -10,9 +10,10 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.core.db import SessionLocal
 from app.core.logging import configure_logging, get_logger
+from app.modules.files.gemini_embeddings import create_embedding_provider
 from app.modules.files.models import FileIndexStatus, StoredFile
 from app.modules.files.qdrant_client import QdrantVectorStore
-from app.modules.files.service import EmbeddingProvider, FileService
+from app.modules.files.service import FileService
 from app.modules.files.storage import FileStorage, S3Config
 
 logger = get_logger(__name__)
@@ -26,19 +27,13 @@ async def startup(ctx: dict[str, Any]) -> None:
     configure_logging()
     logger.info("File indexer worker starting up")
 
-    ctx["storage_cfg"] = S3Config(
-        endpoint_url=settings.S3_ENDPOINT_URL,
-        access_key=settings.S3_ACCESS_KEY,
-        secret_key=settings.S3_SECRET_KEY,
-        region=settings.S3_REGION,
-        bucket_admin_laws=settings.S3_BUCKET_ADMIN_LAWS,
-        bucket_customer_docs=settings.S3_BUCKET_CUSTOMER_DOCS,
-    )
+    ctx["storage_cfg"] = S3Config.from_settings(settings)
 
     ctx["qdrant"] = QdrantVectorStore(
         url=settings.QDRANT_URL,
         collection_name=settings.QDRANT_COLLECTION_NAME,
         vector_size=settings.QDRANT_VECTOR_SIZE,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
     )
 
 
@@ -57,7 +52,7 @@ async def index_file_task(ctx: dict[str, Any], file_id: str) -> None:
     try:
         storage = FileStorage(cfg=ctx["storage_cfg"])
         vector_store: QdrantVectorStore = ctx["qdrant"]
-        embedding_provider = EmbeddingProvider(settings.QDRANT_VECTOR_SIZE)
+        embedding_provider = create_embedding_provider(settings)
 
         service = FileService(
             db=db,
@@ -67,7 +62,7 @@ async def index_file_task(ctx: dict[str, Any], file_id: str) -> None:
         )
 
         # Обновляем статус файла -> RUNNING
-        stored_file: StoredFile | None = db.query(StoredFile).get(file_id)
+        stored_file: StoredFile | None = db.get(StoredFile, file_id)
         if not stored_file:
             logger.warning("Stored file not found", extra={"file_id": file_id})
             return
@@ -75,11 +70,12 @@ async def index_file_task(ctx: dict[str, Any], file_id: str) -> None:
         stored_file.index_status = FileIndexStatus.RUNNING
         db.commit()
 
-        # Синхронная индексация внутри воркера (можно асинхронизировать позже)
-        service.index_file(file_id)
+        # Индексация синхронная (S3, эмбеддинги, Qdrant, Postgres): уводим её
+        # в поток, чтобы event loop воркера продолжал обслуживать Arq
+        await asyncio.to_thread(service.index_file, file_id)
 
         # index_file сам проставляет is_indexed/index_error, здесь можно добить статус/время
-        stored_file = db.query(StoredFile).get(file_id)
+        stored_file = db.get(StoredFile, file_id)
         if stored_file and stored_file.is_indexed and not stored_file.index_error:
             from datetime import datetime
 
@@ -102,7 +98,7 @@ async def index_file_task(ctx: dict[str, Any], file_id: str) -> None:
         )
         # Пытаемся зафиксировать ошибку в БД
         try:
-            stored_file = db.query(StoredFile).get(file_id)
+            stored_file = db.get(StoredFile, file_id)
             if stored_file:
                 stored_file.index_status = FileIndexStatus.ERROR
                 stored_file.is_indexed = False
@@ -122,10 +118,9 @@ class WorkerSettings:
     on_startup = startup
     on_shutdown = shutdown
 
-    # Передаём либо RedisSettings, либо именно строку (но не AnyUrl)
-    redis_settings = RedisSettings.from_dsn(str(settings.REDIS_URL))
+    redis_settings = RedisSettings.from_dsn(settings.REDIS_URL)
 
 
 async def create_redis_pool() -> ArqRedis:
-    return await create_pool(settings.REDIS_URL)
+    return await create_pool(RedisSettings.from_dsn(settings.REDIS_URL))
 
@@ -0,0 +1,54 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+import app.modules.files.models  # noqa: F401  (маппинг связей User)
+from app.modules.auth.repository import UserRepository
+
+
+class _CapturingSession:
+    """Заглушка AsyncSession: запоминает выполненный запрос."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return self
+
+    def first(self):
+        return None
+
+
+def _find_conflict_sql(email, phone):
+    session = _CapturingSession()
+    asyncio.run(UserRepository(session).find_conflict(email, phone))
+    (stmt,) = session.statements
+    return str(
+        stmt.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def test_find_conflict_without_email_matches_only_phone():
+    sql = _find_conflict_sql(None, "+77001234567")
+
+    assert "IS NULL" not in sql
+    assert "false AS email_match" in sql
+    assert "users.telegram_phone = '+77001234567' AS phone_match" in sql
+
+
+def test_find_conflict_without_phone_matches_only_email():
+    sql = _find_conflict_sql("User@Example.com", None)
+
+    assert "IS NULL" not in sql
+    assert "false AS phone_match" in sql
+    assert "'user@example.com' AS email_match" in sql
+
+
+def test_find_conflict_without_email_and_phone_skips_query():
+    session = _CapturingSession()
+
+    assert asyncio.run(UserRepository(session).find_conflict(None, None)) is None
+    assert session.statements == []
@@ -0,0 +1,71 @@
+import msgspec
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import RuntimeSettings, Settings, settings
+
+# Полный список настроек: поле, случайно пропавшее из Settings (как
+# GEMINI_API_KEY), ломает обращения settings.* уже на импорте модулей
+EXPECTED_FIELDS = {
+    "ENV",
+    "DATABASE_URL",
+    "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW",
+    "DB_POOL_RECYCLE_SECONDS",
+    "DB_POOL_TIMEOUT_SECONDS",
+    "DB_STATEMENT_CACHE_SIZE",
+    "DB_PGBOUNCER",
+    "SECRET_KEY",
+    "ACCESS_TOKEN_EXPIRE_MINUTES",
+    "JWT_ALGORITHM",
+    "JWT_DECODE_CACHE_SIZE",
+    "JWT_DECODE_CACHE_TTL_SECONDS",
+    "USER_CACHE_SIZE",
+    "USER_CACHE_TTL_SECONDS",
+    "LOGIN_MAX_FAILURES",
+    "LOGIN_FAILURE_WINDOW_SECONDS",
+    "LOGIN_FAILURE_CACHE_SIZE",
+    "TRUSTED_PROXIES",
+    "TELEGRAM_BOT_TOKEN",
+    "S3_ENDPOINT_URL",
+    "S3_ACCESS_KEY",
+    "S3_SECRET_KEY",
+    "S3_REGION",
+    "S3_BUCKET_ADMIN_LAWS",
+    "S3_BUCKET_CUSTOMER_DOCS",
+    "QDRANT_URL",
+    "QDRANT_COLLECTION_NAME",
+    "QDRANT_VECTOR_SIZE",
+    "QDRANT_PREFER_GRPC",
+    "GEMINI_API_KEY",
+    "CA_BUNDLE",
+    "EMBEDDING_PROVIDER",
+    "GEMINI_EMBEDDING_MODEL",
+    "EMBEDDING_BATCH_SIZE",
+    "EMBEDDING_CONCURRENCY",
+    "EMBEDDING_REQUESTS_PER_MINUTE",
+    "EMBEDDING_HEDGE_AFTER_SECONDS",
+    "EMBEDDING_FUZZY_CACHE",
+    "EMBEDDING_FUZZY_MAX_DISTANCE",
+    "REDIS_URL",
+}
+
+
+def test_settings_declare_expected_fields():
+    assert set(Settings.model_fields) == EXPECTED_FIELDS
+
+
+def test_runtime_settings_mirror_settings_fields():
+    runtime_fields = {field.name for field in msgspec.structs.fields(RuntimeSettings)}
+
+    assert runtime_fields == set(Settings.model_fields)
+    assert isinstance(settings, RuntimeSettings)
+
+
+def test_fuzzy_max_distance_accepts_values_covered_by_bands():
+    assert Settings(EMBEDDING_FUZZY_MAX_DISTANCE=3).EMBEDDING_FUZZY_MAX_DISTANCE == 3
+
+
+def test_fuzzy_max_distance_rejects_values_above_bands():
+    with pytest.raises(ValidationError, match="EMBEDDING_FUZZY_MAX_DISTANCE"):
+        Settings(EMBEDDING_FUZZY_MAX_DISTANCE=4)
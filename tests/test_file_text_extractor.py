@@ -0,0 +1,81 @@
+import io
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from app.modules.files.file_text_extractor import (
+    _read_docx_blocks,
+    _read_docx_blocks_python_docx,
+)
+
+_TEXTBOX_XML = (
+    '<w:pict %s xmlns:v="urn:schemas-microsoft-com:vml">'
+    "<v:shape><v:textbox><w:txbxContent>"
+    "<w:p><w:r><w:t>text in a textbox</w:t></w:r></w:p>"
+    "</w:txbxContent></v:textbox></v:shape></w:pict>" % nsdecls("w")
+)
+
+
+def _docx_fixture() -> bytes:
+    document = Document()
+    document.add_paragraph("First paragraph")
+
+    paragraph = document.add_paragraph("Before page break")
+    paragraph.add_run().add_break(WD_BREAK.PAGE)
+    paragraph.add_run("after page break")
+    run = paragraph.add_run("\tline")
+    run.add_break()
+    paragraph.add_run("next line")
+
+    boxed = document.add_paragraph("Paragraph with a textbox")
+    boxed.add_run()._r.append(parse_xml(_TEXTBOX_XML))
+
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "a"
+    table.cell(0, 1).text = "b\nc"
+    table.cell(1, 1).text = "z"
+    document.add_paragraph("Last paragraph")
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_streaming_docx_matches_python_docx():
+    file_bytes = _docx_fixture()
+
+    paragraphs, table_rows = _read_docx_blocks(file_bytes)
+
+    assert (paragraphs, table_rows) == _read_docx_blocks_python_docx(file_bytes)
+    assert "Before page breakafter page break\tline\nnext line" in paragraphs
+    assert "Paragraph with a textbox" in paragraphs
+    assert not any("text in a textbox" in text for text in paragraphs)
+
+
+def _merged_cells_fixture() -> bytes:
+    document = Document()
+    table = document.add_table(rows=4, cols=4)
+    for row_index, row in enumerate(table.rows):
+        for column_index, cell in enumerate(row.cells):
+            cell.text = f"r{row_index}c{column_index}"
+
+    # gridSpan, vMerge и объединение блоком 2x2 (оба сразу)
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "wide"
+    table.cell(1, 0).merge(table.cell(3, 0)).text = "tall"
+    table.cell(1, 2).merge(table.cell(2, 3)).text = "block"
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_streaming_docx_merged_cells_match_python_docx():
+    file_bytes = _merged_cells_fixture()
+
+    _, table_rows = _read_docx_blocks(file_bytes)
+
+    assert table_rows == _read_docx_blocks_python_docx(file_bytes)[1]
+    assert table_rows[0] == "wide | wide | r0c2 | r0c3"
+    assert table_rows[2] == "tall | r2c1 | block | block"
@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from ipaddress import ip_network
+
+from starlette.requests import Request
+
+from app.core.cache import TTLCache
+from app.modules.auth import router
+
+
+def _request(peer: str, forwarded: str | None = None) -> Request:
+    headers = []
+    if forwarded is not None:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    return Request({"type": "http", "client": (peer, 12345), "headers": headers})
+
+
+def test_increment_counts_concurrent_failures():
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: cache.increment("key"), range(1000)))
+
+    assert cache.get("key") == 1000
+
+
+def test_client_ip_ignores_forwarded_header_from_untrusted_peer(monkeypatch):
+    monkeypatch.setattr(router, "_TRUSTED_PROXIES", [ip_network("10.0.0.0/8")])
+
+    assert router._client_ip(_request("203.0.113.5", "198.51.100.1")) == "203.0.113.5"
+
+
+def test_client_ip_uses_forwarded_client_behind_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(router, "_TRUSTED_PROXIES", [ip_network("10.0.0.0/8")])
+
+    request = _request("10.0.0.2", "198.51.100.7, 203.0.113.9, 10.0.0.3")
+
+    assert router._client_ip(request) == "203.0.113.9"